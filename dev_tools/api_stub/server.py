@@ -0,0 +1,61 @@
+"""
+Local stand-in for the WG / Lesta API, to benchmark the bot without burning real quota.
+
+Usage Example:
+    python -m dev_tools.api_stub.server --players 10000 --latency 0.08 --limit-exceeded-rate 0.01
+
+Then point the bot at it with `game_api.transport.base_url: http://127.0.0.1:8765` in settings.yaml.
+Request and error counters are served on `/_stats`.
+"""
+import argparse
+import json
+import os
+
+from aiohttp import web
+
+from dev_tools.api_stub.stub_api import StubApi
+
+DEFAULT_FIXTURES_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+
+def create_app(stub: StubApi) -> web.Application:
+    async def stats_handler(_: web.Request) -> web.Response:
+        return web.json_response(stub.get_counters())
+
+    async def api_handler(request: web.Request) -> web.Response:
+        status, body = await stub.handle(request.path, request.query_string)
+        return web.Response(status=status, body=body, content_type='application/json')
+
+    app = web.Application()
+    app.router.add_get('/_stats', stats_handler)
+    app.router.add_get('/{tail:.*}', api_handler)
+    return app
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='WG / Lesta API stub server')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--fixtures', default=DEFAULT_FIXTURES_DIR, help='Directory of the recorded fixtures')
+    parser.add_argument('--players', type=int, default=0, help='Synthetic accounts served on top of the recorded ones')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean response latency in seconds')
+    parser.add_argument('--limit-exceeded-rate', type=float, default=0.0, help='Share of REQUEST_LIMIT_EXCEEDED answers')
+    parser.add_argument('--unavailable-rate', type=float, default=0.0, help='Share of 504 answers')
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    stub = StubApi(
+        args.fixtures,
+        players=args.players,
+        latency=args.latency,
+        limit_exceeded_rate=args.limit_exceeded_rate,
+        unavailable_rate=args.unavailable_rate,
+        seed=args.seed
+    )
+    print(f'Serving {len(stub.templates)} recorded and {args.players} synthetic accounts: '
+          f'{json.dumps(vars(args))}')
+    web.run_app(create_app(stub), host=args.host, port=args.port)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,161 @@
+import asyncio
+import copy
+import json
+import os
+import random
+from collections import Counter
+from urllib.parse import parse_qs
+
+BASE_ACCOUNT_ID = 500_000_000
+SYNTHETIC_PREFIX = 'stub_'
+
+PER_ACCOUNT_ENDPOINTS = ('account_info', 'account_achievements', 'clans_accountinfo', 'tanks_stats')
+
+
+class StubApi:
+    """
+    Stand-in for the WG / Lesta API, answering from recorded fixtures.
+
+    Fixtures are recorded API responses, one `<endpoint>.json` file per endpoint (e.g.
+    `account_info.json` for `/wotb/account/info/`), see `HttpTransport.record_dir`. The
+    recorded accounts are served as they are, and `players` synthetic accounts are derived
+    from them: `stub_<n>` with account id `BASE_ACCOUNT_ID + n`.
+
+    Every request waits `latency` seconds (+-50% jitter), then fails with `504` with the
+    `unavailable_rate` probability or with `REQUEST_LIMIT_EXCEEDED` with the
+    `limit_exceeded_rate` probability.
+    """
+    def __init__(
+            self,
+            fixtures_dir: str,
+            players: int = 0,
+            latency: float = 0.0,
+            limit_exceeded_rate: float = 0.0,
+            unavailable_rate: float = 0.0,
+            seed: int | None = None
+        ) -> None:
+        self.players = players
+        self.latency = latency
+        self.limit_exceeded_rate = limit_exceeded_rate
+        self.unavailable_rate = unavailable_rate
+        self.random = random.Random(seed)
+
+        self.fixtures: dict[str, dict] = {}
+        for file_name in os.listdir(fixtures_dir):
+            if file_name.endswith('.json'):
+                with open(os.path.join(fixtures_dir, file_name), encoding='utf-8') as file:
+                    self.fixtures[file_name[:-5]] = json.load(file)
+
+        self.templates = sorted(self.fixtures['account_info']['data'], key=int)
+        self.nicknames = {
+            info['nickname'].lower(): int(account_id)
+            for account_id, info in self.fixtures['account_info']['data'].items()
+        }
+
+        self.requests: Counter[str] = Counter()
+        self.errors: Counter[str] = Counter()
+
+    def get_counters(self) -> dict[str, dict[str, int]]:
+        return {'requests': dict(self.requests), 'errors': dict(self.errors)}
+
+    async def handle(self, path: str, query: str) -> tuple[int, bytes]:
+        """
+        Answers one API request.
+
+        Args:
+            path (str): The request path, e.g. `/wotb/account/info/`.
+            query (str): The raw query string.
+
+        Returns:
+            tuple[int, bytes]: The HTTP status and the response body.
+        """
+        endpoint = path.strip().strip('/').removeprefix('wotb/').replace('/', '_')
+        params = {key.strip(): values[0].strip() for key, values in parse_qs(query).items()}
+        self.requests[endpoint] += 1
+
+        if self.latency:
+            await asyncio.sleep(self.latency * self.random.uniform(0.5, 1.5))
+
+        roll = self.random.random()
+        if roll < self.unavailable_rate:
+            self.errors['unavailable'] += 1
+            return 504, b'Gateway Time-out'
+        if roll < self.unavailable_rate + self.limit_exceeded_rate:
+            self.errors['limit_exceeded'] += 1
+            return 200, self._error(407, 'REQUEST_LIMIT_EXCEEDED')
+
+        if endpoint == 'account_list':
+            data = self._search(params.get('search', ''), params.get('type', 'startswith'), int(params.get('limit', 100)))
+        elif endpoint in PER_ACCOUNT_ENDPOINTS:
+            account_ids = [account_id for account_id in params.get('account_id', '').split(',') if account_id]
+            if not account_ids:
+                return 200, self._error(402, 'ACCOUNT_ID_NOT_SPECIFIED')
+            data = {account_id: self._get_account_data(endpoint, int(account_id)) for account_id in account_ids}
+        elif endpoint in self.fixtures:
+            data = self.fixtures[endpoint]['data']
+        else:
+            return 404, self._error(404, 'METHOD_NOT_FOUND')
+
+        return 200, json.dumps({'status': 'ok', 'meta': {'count': len(data)}, 'data': data}).encode()
+
+    @staticmethod
+    def _error(code: int, message: str) -> bytes:
+        return json.dumps({
+            'status': 'error',
+            'error': {'code': code, 'message': message, 'field': None, 'value': None}
+        }).encode()
+
+    def _resolve(self, account_id: int) -> tuple[str, str | None] | None:
+        """
+        Returns the template account id and the synthetic nickname (None for recorded accounts).
+        """
+        if str(account_id) in self.fixtures['account_info']['data']:
+            return str(account_id), None
+
+        index = account_id - BASE_ACCOUNT_ID
+        if 0 <= index < self.players:
+            return self.templates[index % len(self.templates)], f'{SYNTHETIC_PREFIX}{index}'
+        return None
+
+    def _get_account_data(self, endpoint: str, account_id: int):
+        resolved = self._resolve(account_id)
+        fixture = self.fixtures.get(endpoint)
+        if resolved is None or fixture is None:
+            return None
+
+        template_id, nickname = resolved
+        data = fixture['data'].get(template_id)
+        if data is None or nickname is None:
+            return data
+
+        data = copy.deepcopy(data)
+        for item in data if isinstance(data, list) else [data]:
+            item['account_id'] = account_id
+            if 'nickname' in item:
+                item['nickname'] = nickname
+            if 'account_name' in item:
+                item['account_name'] = nickname
+        return data
+
+    def _search(self, search: str, search_type: str, limit: int) -> list[dict]:
+        search = search.lower()
+        found = []
+
+        for nickname, account_id in self.nicknames.items():
+            if nickname == search or (search_type != 'exact' and nickname.startswith(search)):
+                found.append({'nickname': self.fixtures['account_info']['data'][str(account_id)]['nickname'],
+                              'account_id': account_id})
+
+        if search_type == 'exact':
+            index = search.removeprefix(SYNTHETIC_PREFIX)
+            if search.startswith(SYNTHETIC_PREFIX) and index.isdigit() and int(index) < self.players:
+                found.append({'nickname': search, 'account_id': BASE_ACCOUNT_ID + int(index)})
+        elif SYNTHETIC_PREFIX.startswith(search) or search.startswith(SYNTHETIC_PREFIX):
+            for index in range(self.players):
+                if len(found) >= limit:
+                    break
+                nickname = f'{SYNTHETIC_PREFIX}{index}'
+                if nickname.startswith(search):
+                    found.append({'nickname': nickname, 'account_id': BASE_ACCOUNT_ID + index})
+
+        return found[:limit]
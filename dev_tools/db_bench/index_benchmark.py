@@ -0,0 +1,103 @@
+"""
+Reports the query plan and latency of the hot MongoDB queries, without and with the registry indexes.
+
+"Before" forces a collection scan with `hint({'$natural': 1})`, "after" lets the planner use the
+indexes of `lib.database.indexes.INDEXES`, which are applied first. Nothing is dropped.
+
+Usage Example:
+    python -m dev_tools.db_bench.index_benchmark --runs 200
+"""
+import argparse
+import asyncio
+import statistics
+from datetime import datetime, timedelta
+from time import perf_counter
+
+import pytz
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+
+from lib.database.indexes import apply_indexes
+from lib.settings.settings import Config
+
+_config = Config().get()
+
+
+def _get_stages(plan: dict) -> list[str]:
+    stages = []
+    while plan:
+        stages.append(plan['stage'])
+        plan = plan.get('inputStage')
+    return stages
+
+
+async def _get_queries(client: AsyncIOMotorClient) -> list[tuple[str, AsyncIOMotorCollection, dict]]:
+    """
+    Builds the benchmarked queries from values of existing documents.
+    """
+    players = client['TgPlayersDB']['players']
+    queries = []
+
+    member = await players.find_one({}, {'id': 1})
+    if member is not None:
+        queries.append(('players by id', players, {'id': member['id']}))
+
+    queries.append(('players with active hook', players, {'hook_stats.active': True}))
+    queries.append(('inactive players', players, {
+        'profile.last_activity': {'$lt': datetime.now(pytz.utc) - timedelta(seconds=_config.account.inactive_ttl)}
+    }))
+
+    for region in ('ru', 'eu'):
+        tanks = client['TankopediaDB'][f'tanks_{region}']
+        tank = await tanks.find_one({}, {'id': 1})
+        if tank is not None:
+            queries.append((f'tanks_{region} by id', tanks, {'id': tank['id']}))
+
+    queries.append(('internal info', client['TgInternalDB']['internal'], {'name': 'internal_info'}))
+    return queries
+
+
+async def _measure(collection: AsyncIOMotorCollection, query: dict, runs: int, hint: dict | None) -> dict:
+    def make_cursor():
+        cursor = collection.find(query)
+        return cursor.hint(hint) if hint is not None else cursor
+
+    explain = await make_cursor().explain()
+    execution = explain.get('executionStats', {})
+
+    latencies = []
+    for _ in range(runs):
+        started = perf_counter()
+        await make_cursor().to_list(None)
+        latencies.append((perf_counter() - started) * 1000)
+    latencies.sort()
+
+    return {
+        'plan': ' <- '.join(_get_stages(explain['queryPlanner']['winningPlan'])),
+        'docs_examined': execution.get('totalDocsExamined'),
+        'returned': execution.get('nReturned'),
+        'p50_ms': round(statistics.median(latencies), 3),
+        'p95_ms': round(latencies[int(len(latencies) * 0.95) - 1], 3),
+    }
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description='MongoDB index benchmark')
+    parser.add_argument('--url', default='mongodb://localhost:27017')
+    parser.add_argument('--runs', type=int, default=100, help='Runs of every query, for the latency percentiles')
+    args = parser.parse_args()
+
+    client = AsyncIOMotorClient(args.url)
+    created = await apply_indexes(client)
+    print(f'Created indexes: {created or "none, all present"}')
+
+    for name, collection, query in await _get_queries(client):
+        before = await _measure(collection, query, args.runs, {'$natural': 1})
+        after = await _measure(collection, query, args.runs, None)
+        print(f'\n{name}: {query}')
+        for label, result in (('before', before), ('after', after)):
+            print(f'  {label:<6} {result["plan"]:<40} examined={result["docs_examined"]} '
+                  f'returned={result["returned"]} p50={result["p50_ms"]}ms p95={result["p95_ms"]}ms')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -6,6 +6,7 @@ from aiogram.types import BufferedInputFile, InlineQueryResultCachedPhoto
 
 from lib.settings.settings import Config
 from lib.utils.nickname_handler import handle_nickname
+from lib.utils.request_context import get_context_member
 from lib.utils.validators import validate
 
 from extensions.setup import ExtensionsSetup
@@ -42,8 +43,7 @@ class Stats(ExtensionsSetup):
     @analytics("stats")
     @parse_message(max_args=2, min_args=0)
     async def stats(self, msg: 'Message', splitted_message: list[str], bot: 'Bot', **_):
-        member = await self.pdb.check_member_exists(msg.from_user.id, get_if_exist=True, raise_error=False)
-        member = member if member else None
+        member = await get_context_member(msg.from_user.id)
 
         if len(splitted_message) == 2:
             region = splitted_message[1]
@@ -1,15 +1,13 @@
 import asyncio
-import json
 import traceback
 from datetime import datetime
-from time import time
+from time import monotonic
 from typing import TYPE_CHECKING, Dict, Union
 
 import aiohttp
 import pytz
 from aiohttp import client_exceptions
-from asynciolimiter import Limiter
-from cacheout import FIFOCache, Cache
+from pydantic import BaseModel, ValidationError
 from the_retry import retry
 
 from lib.data_classes.api.api_data import PlayerGlobalData
@@ -17,11 +15,24 @@ from lib.data_classes.api.player_achievements import Achievements
 from lib.data_classes.api.player_clan_stats import ClanStats
 from lib.data_classes.api.player_stats import PlayerStats
 from lib.data_classes.api.rating_leaderboard import RatingLeaderboardAPIResponse
-from lib.data_classes.api.tanks_stats import TankStats
+from lib.data_classes.api.tanks_stats import TanksStatsResponse
 from lib.data_parser.parse_data import get_normalized_data
+from lib.api.decoding import JSON_BACKEND, loads
+from lib.api.fetch_context import PlayerFetchContext
+from lib.api.fields import StatsFields
+from lib.api.single_flight import SingleFlight
+from lib.api.cache import CacheState, PlayerStatsCache, TankStatsSnapshots
+from lib.api.batcher import MAX_BATCH_SIZE, MicroBatcher
+from lib.api.rate_limiter import AdaptiveRateLimiter, TokenBucket
+from lib.api.scheduler import PriorityScheduler, RequestPriority, request_priority
+from lib.api.circuit_breaker import CircuitBreaker
+from lib.api.hedging import LatencyTracker, hedged
+from lib.api.transport import TransportResponse, get_transport
+from lib.api.nickname_index import NEGATIVE_ERRORS, NicknameIndex
+from lib.api.leaderboard import LEADERBOARD_REGIONS, RatingLeaderboardStore
 from lib.exceptions import api as api_exceptions
 from lib.logger.logger import get_logger
-from lib.settings.settings import Config, EnvConfig
+from lib.settings.settings import Config
 from lib.utils.singleton_factory import singleton
 from lib.utils.string_parser import insert_data
 
@@ -38,64 +49,117 @@ _config = Config().get()
 @singleton
 class API:
     def __init__(self) -> None:
-        self.exact = True
-        self.raw_dict = False
-        self._players_stats = []
-        self.start_time = 0
-        self.rate_limiter = Limiter(19)
-        self.rating_leaderboard_num_cache = Cache(ttl=210)
-        self.cache = FIFOCache(maxsize=100, ttl=60)
+        self.rate_limiter = AdaptiveRateLimiter()
+        self.scheduler = PriorityScheduler(self.rate_limiter)
+        self.breakers: dict[str, CircuitBreaker] = {}
+        self.latencies: dict[str, LatencyTracker] = {}
+        self.hedges_sent = 0
+        self.leaderboard = RatingLeaderboardStore(_config.game_api.rating_leaderboard.max_age)
+        self.leaderboard_bucket = TokenBucket(_config.game_api.rating_leaderboard.rate)
+        self.cache = PlayerStatsCache(
+            max_bytes=_config.game_api.stats_cache.max_bytes,
+            ttl=_config.game_api.stats_cache.ttl,
+            stale_ttl=_config.game_api.stats_cache.stale_ttl
+        )
+        self.tank_snapshots = TankStatsSnapshots(_config.game_api.stats_cache.tank_snapshots)
+        self.nicknames = NicknameIndex(
+            ttl=_config.game_api.nickname_index.ttl,
+            negative_ttl=_config.game_api.nickname_index.negative_ttl,
+            max_entries=_config.game_api.nickname_index.max_entries
+        )
+        self._background_tasks: set[asyncio.Task] = set()
+
+        self.account_info_batcher = MicroBatcher('account_info', self._fetch_accounts_info)
+        self.achievements_batcher = MicroBatcher('achievements', self._fetch_accounts_achievements)
+        self.clan_info_batcher = MicroBatcher('clan_info', self._fetch_accounts_clan_info)
         self.pdb = PlayersDB()
+        self.transport = get_transport()
+        self.player_flight = SingleFlight('get_player')
+        self.stats_flight = SingleFlight('get_stats')
+        _log.debug(f'JSON backend: {JSON_BACKEND}')
 
-        self.player_stats = {}
-        self.player = {}
+    def get_metrics(self) -> dict[str, dict]:
+        """
+        Returns the counters of the API client subsystems.
+        """
+        return {
+            'player_flight': self.player_flight.get_counters(),
+            'stats_flight': self.stats_flight.get_counters(),
+            'stats_cache': self.cache.get_counters(),
+            'tank_snapshots': self.tank_snapshots.get_counters(),
+            'nickname_index': self.nicknames.get_counters(),
+            'rating_leaderboard': self.leaderboard.get_counters(),
+            'account_info_batcher': self.account_info_batcher.get_counters(),
+            'achievements_batcher': self.achievements_batcher.get_counters(),
+            'clan_info_batcher': self.clan_info_batcher.get_counters(),
+            'rate_limiter': self.rate_limiter.get_counters(),
+            'scheduler': self.scheduler.get_counters(),
+            'circuit_breakers': {region: breaker.get_counters() for region, breaker in self.breakers.items()},
+            'hedging': {
+                'hedges_sent': self.hedges_sent,
+                'hedge_delay': {region: self._get_hedge_delay(region) for region in self.latencies},
+            },
+        }
+
+    async def seed_nickname_index(self) -> None:
+        """
+        Fills the nickname index with the game accounts of all members. Called once on bot startup.
+        """
+        accounts = await self.pdb.get_all_game_accounts()
+        for account in accounts:
+            try:
+                self.nicknames.add(self._reg_normalizer(account.region), account.nickname, account.game_id)
+            except api_exceptions.UncorrectRegion:
+                continue
+        _log.info(f'Nickname index seeded with {len(accounts)} game accounts')
 
-    def _get_id_by_reg(self, reg: str) -> str:
-        reg = reg.lower()
-        if reg == 'ru':
-            return next(EnvConfig.LT_APP_IDS)
-        elif reg in {'eu', 'com', 'asia', 'na', 'as'}:
-            tok = next(EnvConfig.WG_APP_IDS)
-            _log.debug(f'Used app ID: {tok}')
-            return tok
-        raise api_exceptions.UncorrectRegion(f'Uncorrect region: {reg}')
+    async def close(self) -> None:
+        """
+        Closes the transport and its pooled sessions. Must be called once on bot shutdown.
+        """
+        await self.transport.close()
 
     def _reg_normalizer(self, reg: str) -> str:
         if reg in {'ru', 'eu', 'asia'}:
             return reg
-        if reg == 'na':
+        if reg in {'na', 'com'}:
             return 'com'
         else:
             raise api_exceptions.UncorrectRegion(f'Uncorrect region: {reg}')
         
     async def response_handler(
             self,
-            response: aiohttp.ClientResponse, 
+            response: TransportResponse, 
             check_data_status: bool = True,
             check_battles: bool = False,
             check_data: bool = False,
-            check_meta: bool = False
-            ) -> dict: 
+            check_meta: bool = False,
+            model: type[BaseModel] | None = None
+            ) -> dict | BaseModel: 
         """
         Asynchronously handles the response from the API and returns the data as a dictionary.
 
+        The body is decoded straight from bytes. With `model`, a successful response is validated
+        in one pass from the raw bytes, error responses don't match the model and go through the
+        regular checks.
+
         Args:
-            response (aiohttp.ClientResponse): The response object received from the API.
+            response (TransportResponse): The response received from the API.
             check_data_status (bool, optional): Flag to indicate whether to check the status of the data. Defaults to True.
+            model (type[BaseModel] | None, optional): Model to validate the response with. Defaults to None.
 
         Raises:
             api_exceptions.APIError: Raised if the response status is not 200 or the data status is not 'ok'.
             api_exceptions.NeedMoreBattlesError: Raised if the number of battles is less than 100 (Optional).
             api_exceptions.RequestsLimitExceeded: Raised if the request limit is exceeded.
             api_exceptions.EmptyDataError: Raised if the data is empty.
-            api_exceptions.APISourceNotAvailable: Raised if the API source is not available (code 504).
+            api_exceptions.APISourceNotAvailable: Raised if the API source is not available (code 502-504).
         Returns:
-            dict: The data returned from the API as a dictionary.
+            dict | BaseModel: The data returned from the API as a dictionary, or the validated model.
         """
         
-        data = await response.text()
-        data = json.loads(data)
-        if response.status == 504:
+        raw = response.body
+        if response.status in (502, 503, 504):
             raise api_exceptions.APISourceNotAvailable()
         if response.status == 407:
             raise api_exceptions.UncorrectName('Uncorrect nickname')
@@ -104,6 +168,14 @@ class API:
             _log.error(f'Error get data, bad response code: {response.status}')
             raise api_exceptions.APIError()
 
+        if model is not None:
+            try:
+                return model.model_validate_json(raw)
+            except ValidationError:
+                pass
+
+        data = loads(raw)
+
         if check_data_status:
             if data['status'] != 'ok':
                 if data['error']['message'] == 'REQUEST_LIMIT_EXCEEDED':
@@ -151,9 +223,102 @@ class API:
             elif isinstance(data['data'], dict):
                 if data['data'][list(data['data'].keys())[0]]['statistics']['all']['battles'] < 1:
                     raise api_exceptions.NeedMoreBattlesError('Need more battles')
+
+        if model is not None:
+            return model.model_validate(data)
             
         return data
 
+    def _get_breaker(self, region: str) -> CircuitBreaker:
+        region = self._reg_normalizer(region)
+        breaker = self.breakers.get(region)
+        if breaker is None:
+            breaker = self.breakers[region] = CircuitBreaker(region)
+        return breaker
+
+    def _get_latency(self, region: str) -> LatencyTracker:
+        region = self._reg_normalizer(region)
+        latency = self.latencies.get(region)
+        if latency is None:
+            hedging_config = _config.game_api.hedging
+            latency = self.latencies[region] = LatencyTracker(hedging_config.window, hedging_config.min_samples)
+        return latency
+
+    def _get_hedge_delay(self, region: str) -> float | None:
+        hedging_config = _config.game_api.hedging
+        threshold = self._get_latency(region).percentile(hedging_config.percentile)
+        if threshold is None:
+            return None
+        return max(threshold, hedging_config.min_delay)
+
+    async def _request(self, region: str, url: str, hedge: bool = False, **handler_kwargs) -> dict | BaseModel:
+        """
+        Sends a GET request to the game API through the circuit breaker, the priority scheduler
+        and the rate limiter of the region.
+
+        The `<app_id>` placeholder of the url is filled with the application ID picked by the
+        limiter, and the outcome is reported back to it. The request priority is taken from
+        the current context, see `lib.api.scheduler.background_priority`.
+
+        With `hedge`, an interactive request that takes longer than the p95 latency of the region
+        is sent a second time and the first response wins.
+
+        Args:
+            region (str): The region of the request.
+            url (str): The request url with an `<app_id>` placeholder.
+            hedge (bool, optional): Whether the request may be hedged. Defaults to False.
+            **handler_kwargs: Keyword arguments passed to `response_handler`.
+
+        Raises:
+            APISourceNotAvailable: If the circuit of the region is open.
+
+        Returns:
+            dict | BaseModel: The data returned by `response_handler`.
+        """
+        delay = None
+        if hedge and _config.game_api.hedging.enabled and request_priority.get() is RequestPriority.INTERACTIVE:
+            delay = self._get_hedge_delay(region)
+
+        if delay is None:
+            return await self._send(region, url, **handler_kwargs)
+
+        data, hedge_sent = await hedged(lambda: self._send(region, url, **handler_kwargs), delay)
+        if hedge_sent:
+            self.hedges_sent += 1
+        return data
+
+    async def _send(self, region: str, url: str, **handler_kwargs) -> dict | BaseModel:
+        breaker = self._get_breaker(region)
+        breaker.before_request()
+
+        try:
+            app_id = await self.scheduler.acquire(region)
+            url = insert_data(url, {'app_id': app_id})
+            start = monotonic()
+
+            response = await self.transport.get(url)
+            try:
+                data = await self.response_handler(response, **handler_kwargs)
+            except api_exceptions.RequestsLimitExceeded:
+                self.rate_limiter.report_limit_exceeded(region, app_id)
+                raise
+
+        except (api_exceptions.APISourceNotAvailable, aiohttp.ClientError, asyncio.TimeoutError):
+            breaker.record_failure()
+            raise
+        except api_exceptions.APIError:
+            # The region answered, the error is about the request
+            breaker.record_success()
+            raise
+        except BaseException:
+            breaker.release()
+            raise
+
+        breaker.record_success()
+        self._get_latency(region).record(monotonic() - start)
+        self.rate_limiter.report_success(region, app_id)
+        return data
+
     def _get_url_by_reg(self, reg: str):
         reg = self._reg_normalizer(reg)
         match reg:
@@ -168,14 +333,12 @@ class API:
             case _:
                 raise api_exceptions.UncorrectRegion(f'Uncorrect region: {reg}')
     
-    def get_players_callback(self, task: asyncio.Task) -> PlayerStats:
-        self._players_stats.append(task.result())
-        
-            
     async def get_players_stats(self, players_id: list[int], region: str) -> list[PlayerStats | bool]:
         """
         Retrieves the statistics of multiple players based on their IDs and region.
 
+        The ids are fetched through the account info batcher, so up to 100 players cost one request.
+
         Parameters:
             players_id (list[int]): A list of player IDs.
             region (str): The region of the players.
@@ -183,49 +346,82 @@ class API:
         Returns:
             list[PlayerStats | bool]: A list of PlayerStats objects representing the statistics of each player. If an error occurs during the retrieval, a boolean value indicating the success of the operation is returned.
         """
-        self._players_stats = []
-        async with aiohttp.ClientSession() as session:
-            async with asyncio.TaskGroup() as tg:
-                for i in players_id:
-                    tg.create_task(self._get_players_stats(i, region, session))
-        
-        return self._players_stats
-                
-    async def _get_players_stats(self, player_id: int, region: str, session: aiohttp.ClientSession) -> None:
+        try:
+            accounts_info = await self.get_accounts_info(region, players_id)
+        except api_exceptions.APIError:
+            _log.debug(f'Error get players stats\n{traceback.format_exc()}')
+            return [False for _ in players_id]
+
+        players_stats = []
+        for player_id in players_id:
+            info = accounts_info.get(int(player_id))
+            if info is None:
+                players_stats.append(False)
+                continue
+            players_stats.append(
+                PlayerStats.model_validate({'status': 'ok', 'meta': {'count': 1}, 'data': info})
+            )
+        return players_stats
+
+    async def get_accounts_info(self, region: str, account_ids: list[int | str]) -> dict[int, dict | None]:
         """
-        Asynchronously gets the player stats for a given player ID and region.
+        Retrieves `wotb/account/info/` data for several accounts with one request per 100 ids.
 
-        Parameters:
-            player_id (int): The ID of the player.
-            region (str): The region of the player.
-            session (aiohttp.ClientSession): The HTTP session for making requests.
+        Args:
+            region (str): The region of the accounts.
+            account_ids (list[int | str]): The account ids.
 
         Returns:
-            None
+            dict[int, dict | None]: The account info keyed by account id, None for unknown accounts.
         """
-        await self.rate_limiter.wait()
-        
+        account_ids = [int(account_id) for account_id in account_ids]
+        async with asyncio.TaskGroup() as tg:
+            tasks = [tg.create_task(self.account_info_batcher.get(region, account_id)) for account_id in account_ids]
+
+        return {account_id: task.result() for account_id, task in zip(account_ids, tasks)}
+
+    @staticmethod
+    def _check_account_info(info: dict | None, check_battles: bool = False) -> dict:
+        if info is None:
+            raise api_exceptions.NoPlayersFound('No players found')
+
+        if check_battles and info['statistics']['all']['battles'] < 1:
+            raise api_exceptions.NeedMoreBattlesError('Need more battles')
+
+        return info
+
+    async def _fetch_batch(self, url: str, region: str) -> dict:
+        data = await self._request(region, url)
+        return data['data'] or {}
+
+    async def _fetch_accounts_info(self, region: str, account_ids: list[int]) -> dict:
         url_get_stats = insert_data(
             _config.game_api.urls.get_stats,
             {
                 'reg_url' : self._get_url_by_reg(region),
-                'app_id': self._get_id_by_reg(region),
-                'player_id': player_id
+                'player_id': ','.join(map(str, account_ids))
             }
         )
-        async with session.get(url_get_stats, verify_ssl=False) as response:
-            try:
-                data = await self.response_handler(response, check_battles=False, check_data=True)
-            except api_exceptions.EmptyDataError:
-                _log.debug(f'Error get player stats\n{traceback.format_exc()}')
-                self._players_stats.append(False)
-            except api_exceptions.APIError:
-                _log.debug(f'Error get player stats\n{traceback.format_exc()}')
-                self._players_stats.append(False)
-            else:
-                account_id = list(data['data'].keys())[0]
-                data['data'] = data['data'][account_id]
-                self._players_stats.append(PlayerStats.model_validate(data))
+        return await self._fetch_batch(url_get_stats, region)
+
+    async def _fetch_accounts_achievements(self, region: str, account_ids: list[int]) -> dict:
+        # Only the medals of the `Achievements` model, the full list is hundreds of entries
+        achievements_fields = ','.join(f'achievements.{name}' for name in Achievements.model_fields)
+        url_get_achievements = (
+            f'https://{self._get_url_by_reg(region)}/wotb/account/achievements/'
+            f'?application_id=<app_id>'
+            f'&fields={achievements_fields}&account_id={",".join(map(str, account_ids))}'
+        )
+        return await self._fetch_batch(url_get_achievements, region)
+
+    async def _fetch_accounts_clan_info(self, region: str, account_ids: list[int]) -> dict:
+        url_get_clan_stats = (
+            f'https://{self._get_url_by_reg(region)}/wotb/clans/accountinfo/'
+            f'?application_id=<app_id>'
+            f'&account_id={",".join(map(str, account_ids))}'
+            f'&extra=clan'
+        )
+        return await self._fetch_batch(url_get_clan_stats, region)
 
     async def retry_callback(self=None):
         _log.debug('Task failed, retrying...')
@@ -252,15 +448,13 @@ class API:
         _log.debug('Get tankopedia data')
         url_get_tankopedia = (
             f'https://{self._get_url_by_reg(region)}/wotb/encyclopedia/vehicles/'
-            f'?application_id={self._get_id_by_reg(region)}&language=en&fields='
+            f'?application_id=<app_id>&language=en&fields='
             f'-description%2C+-engines%2C+-guns%2C-next_tanks%2C+-prices_xp%2C+'
             f'-suspensions%2C+-turrets%2C+-cost%2C+-default_profile%2C+-modules_tree%2C+-images'
         )
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_get_tankopedia, verify_ssl=False) as response:
-                    return await self.response_handler(response, False)
+            return await self._request(region, url_get_tankopedia, check_data_status=False)
 
         except client_exceptions.ClientConnectionError as e:
             raise api_exceptions.APIError('Client Exception Occurred') from e
@@ -278,6 +472,7 @@ class API:
             region: str, 
             nickname: str | None = None, 
             game_id: int | None = None,
+            exact: bool = True,
         ) -> GameAccount:
         """
         Check a player's information.
@@ -285,6 +480,7 @@ class API:
         Args:
             nickname (str): The player's nickname.
             region (str): The player's region.
+            exact (bool, optional): Whether to perform an exact match on the nickname. Defaults to True.
 
         Raises:
             RequestsLimitExceeded: If the request limit is exceeded.
@@ -293,55 +489,19 @@ class API:
         Returns:
             GameAccount: The player's information or None if the player is not found.
         """
-        url_get_id = (
-            f'https://{self._get_url_by_reg(region)}/wotb/account/list/'
-            f'?application_id={self._get_id_by_reg(region)}'
-            f'&search={nickname}'
-            f'&type={"exact" if self.exact else "startswith"}'
-        )
-
         region = self._reg_normalizer(region)
-        async with aiohttp.ClientSession() as session:
-            await self.rate_limiter.wait()
-            data = None
-            if game_id is None:
-                async with session.get(url_get_id, verify_ssl=False) as response:
-                    try:
-                        data = await self.response_handler(response, check_data=True)
-                        data = data['data'][0]
-                        game_id = int(data['account_id'])
-                    except Exception as e:
-                        _log.debug(f'Error check player\n{traceback.format_exc()}')
-                        raise e
-                    
-            url_get_stats = (
-                f'https://{self._get_url_by_reg(region)}/wotb/account/info/'
-                f'?application_id={self._get_id_by_reg(region)}'
-                f'&account_id={game_id}'
-                f'&fields=-statistics.clan'
-            )
-            await self.rate_limiter.wait()
-                
-            async with session.get(url_get_stats, verify_ssl=False) as response:
-                try:
-                    if data is None:
-                        data = await self.response_handler(response, check_battles=True, check_data=True)
-                    else:
-                        await self.response_handler(response, check_battles=True, check_data=True)
-                except Exception as e:
-                    _log.debug(f'Error check player\n{traceback.format_exc()}')
-                    raise e
-                else:
-                    try:
-                        data = data['data'][[*data['data'].keys()][0]]
-                    except KeyError:
-                        ...
-                    game_account = {
-                        'nickname': data['nickname'],
-                        'game_id': int(data['account_id']),
-                        'region': region,
-                    }
-                    return GameAccount.model_validate(game_account)
+        try:
+            data = await self._get_account_info(region, nickname, game_id, exact)
+        except Exception as e:
+            _log.debug(f'Error check player\n{traceback.format_exc()}')
+            raise e
+
+        game_account = {
+            'nickname': data['nickname'],
+            'game_id': int(data['account_id']),
+            'region': region,
+        }
+        return GameAccount.model_validate(game_account)
             
     def done_callback(self, task: asyncio.Task):
         pass
@@ -355,7 +515,8 @@ class API:
         raw_dict: bool = False,
         requested_by: 'DBPlayer | None' = None,
         ignore_lock: bool = False,
-        disable_cache: bool = False
+        disable_cache: bool = False,
+        fields: StatsFields = StatsFields.ALL
         ) -> PlayerGlobalData:
         """
         Asynchronously retrieves player statistics for a game. Optionally filters by game ID, player search string, and region.
@@ -366,6 +527,8 @@ class API:
         - search (str | None): Optional search string for a player's nickname.
         - exact (bool): Whether to perform an exact match on the player's nickname. Defaults to True.
         - raw_dict (bool): Whether to return the player's stats as a raw dictionary. Defaults to False.
+        - fields (StatsFields): The parts of the player data to fetch, `STATISTICS` is always included.
+          Parts that aren't requested are None in the result. Defaults to all of them.
 
         Returns:
         - PlayerGlobalData: An object containing normalized player statistics data or a raw dictionary if raw_dict is True.
@@ -376,79 +539,155 @@ class API:
         - Normalizes and formats the collected data.
         - Returns the player statistics in the desired format.
         """
-        need_caching: bool = False
+        player_key = (
+            self._reg_normalizer(region),
+            int(game_id) if game_id is not None else str(search).lower(),
+            exact
+        )
+        player = await self.player_flight.do(
+            player_key,
+            lambda: self.get_player(
+                region=region, 
+                nickname=search, 
+                game_id=game_id,
+                exact=exact,
+                requested_by=requested_by,
+                ignore_lock=ignore_lock
+            )
+        )
 
-        self.exact = exact
-        self.raw_dict = raw_dict
+        fields |= StatsFields.STATISTICS
+        stats_key = self.cache.make_key(player['account_id'], self._reg_normalizer(region), fields)
+        player_stats = None
 
-        self.start_time = time()
+        if not disable_cache:
+            player_stats, cache_state = self.cache.get(stats_key)
+            cached_fields = fields
+
+            if player_stats is None and fields is not StatsFields.ALL:
+                # A full entry answers any narrower request
+                cached_fields = StatsFields.ALL
+                player_stats, cache_state = self.cache.get(
+                    self.cache.make_key(player['account_id'], self._reg_normalizer(region), cached_fields)
+                )
+            # if not ignore_lock:
+            #     if self.pdb.find_lock(player['account_id'], requested_by):
+            #         raise api_exceptions.LockedPlayer()
+            if cache_state is CacheState.STALE:
+                self._revalidate(
+                    self.cache.make_key(player['account_id'], self._reg_normalizer(region), cached_fields),
+                    player, region, cached_fields
+                )
 
-        player = await self.get_player(
-            region=region, 
-            nickname=search, 
-            game_id=game_id,
-            requested_by=requested_by,
-            ignore_lock=ignore_lock
+        if player_stats is None:
+            player_stats = await self.stats_flight.do(
+                stats_key,
+                lambda: self._fetch_and_cache(stats_key, player, region, fields)
             )
-        
-        if not disable_cache:
-            cached_data = self.cache.get((str(player['account_id']), region))
-            if cached_data is not None:
-                data = PlayerGlobalData.model_validate(cached_data)
-                # if not ignore_lock:
-                #     if self.pdb.find_lock(player['account_id'], requested_by):
-                #         raise api_exceptions.LockedPlayer()
-                data.from_cache = True
-                return get_normalized_data(data)
-            else:
-                need_caching = True
-        
-        self.player['id'] = player['account_id']
+            from_cache = False
+        else:
+            from_cache = True
 
-        tasks = [
-            self.get_player_stats,
-            self.get_player_clan_stats,
-            self.get_player_achievements,
-            self.get_player_tanks_stats
-        ]
-        task_names = [
-            'get_player_stats',
-            'get_player_clan_stats',
-            'get_player_achievements',
-            'get_player_tanks_stats'
-        ]
+        # Cached and coalesced callers share one object, each caller gets its own deep copy
+        # since handlers mutate the stats (e.g. `hide_clan_tag` clears `data.clan_tag`)
+        player_stats = player_stats.model_copy(deep=True)
+        player_stats.from_cache = from_cache
 
-        default_params = {"account_id": player['account_id'], "region": region}
-        self.player, self.player_stats = {}, {}
-        _log.debug('start collect data')
-        async with aiohttp.ClientSession() as self.session:
-            async with asyncio.TaskGroup() as tg:
-                for i, task in enumerate(tasks):
-                    self.create_task(tg, task_names[i], task, default_params)
-            
-        self.player['timestamp'] = int(datetime.now().timestamp())
-        self.player['end_timestamp'] = int(
-            datetime.now().timestamp() +
-            _config.session.ttl
+        if raw_dict:
+            return player_stats.model_dump()
+
+        return player_stats
+
+    async def _fetch_and_cache(
+            self,
+            key: tuple,
+            player: dict,
+            region: str,
+            fields: StatsFields = StatsFields.ALL
+        ) -> PlayerGlobalData:
+        player_stats = get_normalized_data(await self._collect_stats(player, region, fields))
+        self.cache.set(key, player_stats)
+        return player_stats
+
+    def _revalidate(
+            self,
+            key: tuple,
+            player: dict,
+            region: str,
+            fields: StatsFields = StatsFields.ALL
+        ) -> None:
+        """
+        Refreshes a stale cache entry in background, the caller is served the stale one.
+        """
+        if self.stats_flight.is_in_flight(key):
+            return
+
+        task = asyncio.create_task(
+            self.stats_flight.do(key, lambda: self._fetch_and_cache(key, player, region, fields))
         )
-        self.player['id'] = player['account_id']
-        self.player['region'] = self._reg_normalizer(region)
-        self.player['lower_nickname'] = player['nickname'].lower()
-        self.player['timestamp'] = datetime.now(pytz.utc)
-        self.player['nickname'] = player['nickname']
-        self.player['data'] = self.player_stats
+        self._background_tasks.add(task)
+        task.add_done_callback(self._on_revalidate_done)
 
-        player_stats = PlayerGlobalData.model_validate(self.player)
+    def _on_revalidate_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            _log.warning(f'Background stats refresh failed: {task.exception()!r}')
 
-        if self.raw_dict:
-            return player_stats.model_dump()
-        
-        if need_caching:
-            player_stats.from_cache = False
-            self.cache.add((str(game_id), region), player_stats.model_dump())
+    async def _collect_stats(
+            self,
+            player: dict,
+            region: str,
+            fields: StatsFields = StatsFields.ALL
+        ) -> PlayerGlobalData:
+        """
+        Runs the sub-fetchers of the requested fields concurrently and validates the collected player data.
+
+        The statistics are taken from the account info `get_player` has just fetched, so they cost
+        no extra request.
+
+        Args:
+            player (dict): The account info returned by `get_player`.
+            region (str): The region of the player.
+            fields (StatsFields): The parts of the player data to fetch.
+
+        Returns:
+            PlayerGlobalData: The validated, not yet normalized player data.
+        """
+        ctx = PlayerFetchContext(region, player['account_id'], account_info=player)
+
+        statistics = PlayerStats.model_validate({'status': 'ok', 'meta': {'count': 1}, 'data': player}).data.statistics
+        if StatsFields.RATING not in fields:
+            statistics.rating = None
+        elif statistics.rating is not None:
+            statistics.rating.leaderboard_position = self.leaderboard.get_position(
+                self._reg_normalizer(region), player['account_id']
+            )
+        ctx.player_stats['statistics'] = statistics
+
+        tasks = [
+            (StatsFields.CLAN, 'get_player_clan_stats', self.get_player_clan_stats),
+            (StatsFields.ACHIEVEMENTS, 'get_player_achievements', self.get_player_achievements),
+            (StatsFields.TANKS, 'get_player_tanks_stats', self.get_player_tanks_stats),
+        ]
 
-        _log.debug('all user data collected')
-        return get_normalized_data(player_stats)
+        default_params = {"account_id": player['account_id'], "region": region, "ctx": ctx}
+        _log.debug(f'start collect data, fields: {fields}')
+        async with asyncio.TaskGroup() as tg:
+            for field, task_name, task in tasks:
+                if field in fields:
+                    self.create_task(tg, task_name, task, default_params)
+
+        player_stats = PlayerGlobalData.model_validate({
+            'id': player['account_id'],
+            'region': self._reg_normalizer(region),
+            'lower_nickname': player['nickname'].lower(),
+            'timestamp': datetime.now(pytz.utc),
+            'nickname': player['nickname'],
+            'data': ctx.player_stats,
+        })
+
+        _log.debug(f'all user data collected in {ctx.elapsed:.2f}s')
+        return player_stats
 
     def create_task(
             self, 
@@ -474,6 +713,7 @@ class API:
         region: str, 
         nickname: str | None = None, 
         game_id: int | None = None,
+        exact: bool = True,
         requested_by: 'DBPlayer | None' = None,
         ignore_lock: bool = False
         ) -> dict:
@@ -483,10 +723,10 @@ class API:
         Args:
             region (str): The region of the player.
             nickname (str): The nickname of the player.
-            **kwargs: Additional keyword arguments.
+            exact (bool): Whether to perform an exact match on the nickname. Defaults to True.
 
         Returns:
-            int: The account ID of the player.
+            dict: The account info of the player.
 
         Raises:
             api_exceptions.RequestsLimitExceeded: If the API requests limit is exceeded.
@@ -495,40 +735,60 @@ class API:
             api_exceptions.MoreThanOnePlayerFound: If more than one player is found with the given nickname.
             api_exceptions.NoPlayersFound: If no players are found with the given nickname."""
             
+        # if not ignore_lock:
+        #     if self.pdb.find_lock(game_id, requested_by):
+        #         raise api_exceptions.LockedPlayer()
+        
+        return await self._get_account_info(region, nickname, game_id, exact)
+
+    async def _get_account_info(
+            self,
+            region: str,
+            nickname: str | None,
+            game_id: int | None,
+            exact: bool = True
+        ) -> dict:
+        """
+        Returns the account info of a player with at least one battle, by account id or by nickname.
+        """
+        from_index = False
+        if game_id is None:
+            game_id = self.nicknames.lookup(self._reg_normalizer(region), nickname, exact)
+            from_index = game_id is not None
+            if not from_index:
+                game_id = await self._search_nickname(region, nickname, exact)
+
+        info = self._check_account_info(await self.account_info_batcher.get(region, game_id))
+
+        if from_index and exact and info['nickname'].lower() != nickname.lower():
+            # The account was renamed since its nickname was indexed
+            self.nicknames.forget(self._reg_normalizer(region), nickname)
+            game_id = await self._search_nickname(region, nickname, exact)
+            info = self._check_account_info(await self.account_info_batcher.get(region, game_id))
+
+        return self._check_account_info(info, check_battles=True)
+
+    async def _search_nickname(self, region: str, nickname: str, exact: bool = True) -> int:
+        """
+        Resolves a nickname with `wotb/account/list/` and records the outcome in the nickname index.
+        """
         url_get_id = insert_data(
             _config.game_api.urls.get_id,
             {   
-                'app_id'  : self._get_id_by_reg(region),
                 'reg_url' : self._get_url_by_reg(region),
                 'nickname': nickname,
-                'search_type' : 'exact' if self.exact else 'startswith',
+                'search_type' : 'exact' if exact else 'startswith',
             }
         )
 
-        await self.rate_limiter.wait()
-        async with aiohttp.ClientSession() as self.session:
-            if game_id is None:
-                async with self.session.get(url_get_id, verify_ssl=False) as response:
+        try:
+            data = await self._request(region, url_get_id, hedge=True, check_meta=True)
+        except NEGATIVE_ERRORS as error:
+            self.nicknames.add_negative(self._reg_normalizer(region), nickname, exact, error)
+            raise
 
-                    data = await self.response_handler(response, check_meta=True)
-                    game_id: int = data['data'][0]['account_id']
-                    
-            url_get_stats = insert_data(
-            _config.game_api.urls.get_stats,
-                {
-                    'app_id'  : self._get_id_by_reg(region),
-                    'reg_url' : self._get_url_by_reg(region),
-                    'player_id' : game_id
-                }
-            )
-            
-            # if not ignore_lock:
-            #     if self.pdb.find_lock(game_id, requested_by):
-            #         raise api_exceptions.LockedPlayer()
-            
-            async with self.session.get(url_get_stats, verify_ssl=False) as response:
-                data = await self.response_handler(response, check_data=True, check_battles=True)
-                return data['data'][str(game_id)]
+        self.nicknames.add_search(self._reg_normalizer(region), nickname, exact, data['data'])
+        return int(data['data'][0]['account_id'])
             
     @retry(
             expected_exception=(
@@ -550,21 +810,11 @@ class API:
         Returns:
             tuple: The number of common and rating battles of the player.
         """
-        url_get_battles = (
-            f'https://{self._get_url_by_reg(region)}/wotb/account/info/'
-            f'?application_id={self._get_id_by_reg(region)}'
-            f'&account_id={account_id}'
-            f'&fields=-statistics.clan'
-            f'&extra=statistics.rating'
-        )
-        await self.rate_limiter.wait()
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url_get_battles, verify_ssl=False) as response:
-                data = await self.response_handler(response, check_data=True)
+        data = self._check_account_info(await self.account_info_batcher.get(region, account_id))
 
         return (
-            data['data'][str(account_id)]['statistics']['all']['battles'], 
-            data['data'][str(account_id)]['statistics']['rating']['battles']
+            data['statistics']['all']['battles'], 
+            data['statistics']['rating']['battles']
         )
     
 
@@ -576,17 +826,22 @@ class API:
             attempts=3,
             on_exception=retry_callback
     )
-    async def get_player_stats(self, region: str, account_id: str) -> PlayerStats:
+    async def get_player_stats(
+            self, 
+            region: str, 
+            account_id: str, 
+            ctx: PlayerFetchContext | None = None
+        ) -> PlayerFetchContext:
         """
         Retrieves the player statistics for a given region and account ID.
         
         Args:
             region (str): The region of the player (e.g. "NA", "EU", "ASIA").
             account_id (str): The ID of the player's account.
-            **kwargs: Additional keyword arguments to be passed.
+            ctx (PlayerFetchContext | None): The fetch context to fill. A new one is created if None.
         
         Returns:
-            PlayerStats: An object containing the player's statistics.
+            PlayerFetchContext: The context with the `statistics` filled.
         
         Raises:
             RequestsLimitExceeded: If the API requests limit is exceeded.
@@ -594,24 +849,12 @@ class API:
             EmptyDataError: If the "battles" field is not present in the output data.
             NeedMoreBattlesError: If the player has less than 100 battles.
         """
-        url_get_stats = insert_data(
-            _config.game_api.urls.get_stats,
-            {
-                'app_id'  : self._get_id_by_reg(region),
-                'reg_url' : self._get_url_by_reg(region),
-                'player_id' : account_id
-            }
-        )
-
-        await self.rate_limiter.wait()
-        async with self.session.get(url_get_stats, verify_ssl=False) as response:
-            data = await self.response_handler(response, check_battles=True)
-
-        data['data'] = data['data'][str(account_id)]
+        data = self._check_account_info(await self.account_info_batcher.get(region, account_id))
+        data = PlayerStats.model_validate({'status': 'ok', 'meta': {'count': 1}, 'data': data})
 
-        data = PlayerStats.model_validate(data)
-
-        self.player_stats['statistics'] = data.data.statistics
+        ctx = ctx or PlayerFetchContext(region, account_id)
+        ctx.player_stats['statistics'] = data.data.statistics
+        return ctx
 
     @retry(
             expected_exception=(
@@ -621,37 +864,30 @@ class API:
             attempts=3,
             on_exception=retry_callback
     )
-    async def get_player_achievements(self, region: str, account_id: str) -> Achievements:
+    async def get_player_achievements(
+            self, 
+            region: str, 
+            account_id: str, 
+            ctx: PlayerFetchContext | None = None
+        ) -> PlayerFetchContext:
         """
         Retrieves the achievements of a player.
 
         Args:
             region (str): The region of the player.
             account_id (str): The ID of the player's account.
+            ctx (PlayerFetchContext | None): The fetch context to fill. A new one is created if None.
 
         Returns:
-            None
+            PlayerFetchContext: The context with the `achievements` filled.
         """
-        url_get_achievements = (
-            f'https://{self._get_url_by_reg(region)}/wotb/account/achievements/'
-            f'?application_id={self._get_id_by_reg(region)}'
-            f'&fields=-max_series&account_id={account_id}'
-        )
+        data = await self.achievements_batcher.get(region, account_id)
+        if data is None:
+            raise api_exceptions.EmptyDataError(f'API Returned empty achievements for {account_id}')
 
-        await self.rate_limiter.wait()
-        try:
-            if self.session.closed:
-                raise ValueError()
-        except (AttributeError, ValueError):
-            async with aiohttp.ClientSession() as session:
-                async with session.get(url_get_achievements, verify_ssl=False) as response:
-                    data = await self.response_handler(response)
-        else:
-            async with self.session.get(url_get_achievements, verify_ssl=False) as response:
-                data = await self.response_handler(response)
-
-        self.player_stats['achievements'] = Achievements.model_validate(data['data'][str(account_id)]['achievements'])
-        return self.player_stats['achievements']
+        ctx = ctx or PlayerFetchContext(region, account_id)
+        ctx.player_stats['achievements'] = Achievements.model_validate(data['achievements'])
+        return ctx
 
 
     @retry(
@@ -662,44 +898,41 @@ class API:
             attempts=3,
             on_exception=retry_callback
     )
-    async def get_player_clan_stats(self, region: str, account_id: str | int) -> None:
+    async def get_player_clan_stats(
+            self, 
+            region: str, 
+            account_id: str | int, 
+            ctx: PlayerFetchContext | None = None
+        ) -> PlayerFetchContext:
         """
         Retrieves clan statistics for a player.
 
         Args:
             region (str): The region of the player.
             account_id (str | int): The account ID of the player.
+            ctx (PlayerFetchContext | None): The fetch context to fill. A new one is created if None.
 
         Returns:
-            None
+            PlayerFetchContext: The context with the `clan_tag` and `clan_stats` filled.
 
         Raises:
             api_exceptions.RequestsLimitExceeded: If the API requests limit is exceeded.
             api_exceptions.SourceNotAvailable: If the API source is not available.
         """
-        url_get_clan_stats = (
-            f'https://{self._get_url_by_reg(region)}/wotb/clans/accountinfo/'
-            f'?application_id={self._get_id_by_reg(region)}'
-            f'&account_id={account_id}'
-            f'&extra=clan'
-        )
+        data = await self.clan_info_batcher.get(region, account_id)
 
-        await self.rate_limiter.wait()
-        async with self.session.get(url_get_clan_stats, verify_ssl=False) as response:
-            data = await self.response_handler(response)
+        ctx = ctx or PlayerFetchContext(region, account_id)
 
-        if data['data'][str(account_id)] is None:
-            self.player_stats['clan_tag'] = None
-            self.player_stats['clan_stats'] = None
-            return
-        
-        data['data'] = data['data'][str(account_id)]
+        if data is None:
+            ctx.player_stats['clan_tag'] = None
+            ctx.player_stats['clan_stats'] = None
+            return ctx
 
+        data = ClanStats.model_validate({'status': 'ok', 'meta': {'count': 1}, 'data': data})
 
-        data = ClanStats.model_validate(data)
-
-        self.player_stats['clan_tag'] = data.data.clan.tag
-        self.player_stats['clan_stats'] = data.data.clan
+        ctx.player_stats['clan_tag'] = data.data.clan.tag
+        ctx.player_stats['clan_stats'] = data.data.clan
+        return ctx
 
     @retry(
             expected_exception=(
@@ -709,59 +942,158 @@ class API:
             attempts=3,
             on_exception=retry_callback
     )
-    async def get_player_tanks_stats(self, region: str, account_id: str,  **kwargs):
+    async def get_player_tanks_stats(
+            self, 
+            region: str, 
+            account_id: str, 
+            ctx: PlayerFetchContext | None = None, 
+            incremental: bool = True,
+            **kwargs
+        ) -> PlayerFetchContext:
         """
         Retrieves the statistics of the tanks owned by a player.
 
+        In incremental mode the battles count and `last_battle_time` of the account are compared
+        with the last tank snapshot of the player. If the player hasn't played since, the snapshot
+        is reused without a request. Otherwise the list is fetched and only the changed rows are
+        validated again.
+
         Args:
             region (str): The region of the player.
             account_id (str): The account ID of the player.
-            nickname (str): The nickname of the player.
+            ctx (PlayerFetchContext | None): The fetch context to fill. A new one is created if None.
+            incremental (bool, optional): Whether to use the tank snapshots. Defaults to True.
             **kwargs: Additional keyword arguments.
 
         Returns:
-            None
+            PlayerFetchContext: The context with the `tank_stats` filled.
 
         Raises:
             api_exceptions.RequestsLimitExceeded: If the requests limit has been exceeded.
             api_exceptions.SourceNotAvailable: If the data source is not available.
         """
+        ctx = ctx or PlayerFetchContext(region, account_id)
+        snapshot_key = (int(account_id), self._reg_normalizer(region))
+        marker = None
+
+        if incremental:
+            info = ctx.account_info
+            if info is None:
+                info = ctx.account_info = self._check_account_info(
+                    await self.account_info_batcher.get(region, account_id)
+                )
+
+            if info.get('last_battle_time') is not None:
+                marker = (info['statistics']['all']['battles'], info['last_battle_time'])
+                tanks_stats = self.tank_snapshots.get_unchanged(snapshot_key, marker)
+                if tanks_stats is not None:
+                    _log.debug(f'No battles since the last tanks snapshot of {account_id}, reusing it')
+                    ctx.player_stats['tank_stats'] = tanks_stats
+                    return ctx
+
         url_get_tanks_stats = (
             f'https://{self._get_url_by_reg(region)}/wotb/tanks/stats/'
-            f'?application_id={self._get_id_by_reg(region)}'
+            f'?application_id=<app_id>'
             f'&account_id={account_id}'
         )
 
-        await self.rate_limiter.wait()
-        async with self.session.get(url_get_tanks_stats, verify_ssl=False) as response:
-            data = await self.response_handler(response)
+        if marker is not None and snapshot_key in self.tank_snapshots:
+            # Rows stay raw dicts, only the changed ones are validated
+            data = await self._request(region, url_get_tanks_stats, hedge=True)
+            tanks_stats = self.tank_snapshots.merge(snapshot_key, marker, data['data'][str(account_id)] or [])
+        else:
+            data: TanksStatsResponse = await self._request(
+                region, url_get_tanks_stats, hedge=True, model=TanksStatsResponse
+            )
+            tanks_stats = {str(tank.tank_id): tank for tank in data.data[str(account_id)] or []}
+            if marker is not None:
+                self.tank_snapshots.set(snapshot_key, marker, tanks_stats)
 
-        tanks_stats: dict[str, TankStats] = {}
+        ctx.player_stats['tank_stats'] = tanks_stats
+        return ctx
 
-        for tank in data['data'][str(account_id)]:
-            tanks_stats[str(tank['tank_id'])] = TankStats.model_validate(tank)
-            
-        self.player_stats['tank_stats'] = tanks_stats
+    async def get_rating_leaderboards_num(
+            self,
+            game_id: int | str,
+            region: str,
+            use_store: bool = True
+        ) -> RatingLeaderboardAPIResponse | None:
+        """
+        Returns the rating leaderboard entry of a player.
+
+        Args:
+            game_id (int | str): The account ID of the player.
+            region (str): The region of the player, only eu, asia and na have leaderboards.
+            use_store (bool, optional): Whether to answer from the leaderboard store when possible. Defaults to True.
+
+        Returns:
+            RatingLeaderboardAPIResponse | None: The leaderboard entry, None if the player isn't ranked
+            or the leaderboard is not available.
+        """
+        try:
+            region = self._reg_normalizer(region)
+        except api_exceptions.UncorrectRegion:
+            return None
+        if region not in LEADERBOARD_REGIONS:
+            return None
 
-    async def get_rating_leaderboards_num(self, game_id: int | str, region: str) -> RatingLeaderboardAPIResponse | None:
-        if region not in ["eu", "asia", "na"]:
-            _log.info("RatingLeaderboardAPI: uncorrect region")
-            return
-        
         game_id = int(game_id)
+        if use_store and (region, game_id) in self.leaderboard:
+            return self.leaderboard.get(region, game_id)
 
-        if (game_id, region) in self.rating_leaderboard_num_cache:
-            return self.rating_leaderboard_num_cache[(game_id, region)]
-
-        url = f"https://{region}.wotblitz.com/eu/api/rating-leaderboards/user/{game_id}"
-
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as responce:
-                response_data = await responce.json()
-                try:
-                    rlapir = RatingLeaderboardAPIResponse.model_validate(response_data)
-                    self.rating_leaderboard_num_cache.set((game_id, region), rlapir)
-                    return rlapir
-                except:
-                    _log.info(f"RatingLeaderboardAPI: error while validating model, response data:\n{response_data}")
-                    return
+        await self.leaderboard_bucket.acquire()
+        url = insert_data(
+            _config.game_api.rating_leaderboard.url,
+            {'region': LEADERBOARD_REGIONS[region], 'player_id': game_id}
+        )
+
+        try:
+            responce = await self.transport.get(url)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            _log.info(f'RatingLeaderboardAPI: request failed for {game_id} in {region}: {e!r}')
+            return None
+
+        if responce.status == 404:
+            self.leaderboard.set(region, game_id, None)
+            return None
+        if responce.status != 200:
+            _log.info(f'RatingLeaderboardAPI: bad response code {responce.status} for {game_id} in {region}')
+            return None
+
+        try:
+            rlapir = RatingLeaderboardAPIResponse.model_validate(loads(responce.body))
+        except (ValueError, ValidationError):
+            # Accounts without rating battles are answered with an error body
+            _log.debug(f'RatingLeaderboardAPI: no leaderboard entry in response:\n{responce.body[:500]}')
+            rlapir = None
+
+        self.leaderboard.set(region, game_id, rlapir)
+        return rlapir
+
+    async def prefetch_rating_leaderboards(self, accounts: list[tuple[str, int]]) -> int:
+        """
+        Fills the leaderboard store for many accounts, throttled by `game_api.rating_leaderboard.rate`.
+
+        Args:
+            accounts (list[tuple[str, int]]): `(region, account_id)` pairs, regions without
+                a leaderboard are skipped.
+
+        Returns:
+            int: The number of ranked accounts.
+        """
+        accounts = list(dict.fromkeys(
+            (self._reg_normalizer(region), int(game_id)) for region, game_id in accounts
+            if region in LEADERBOARD_REGIONS or region == 'na'
+        ))
+        ranked = 0
+
+        for i in range(0, len(accounts), MAX_BATCH_SIZE):
+            async with asyncio.TaskGroup() as tg:
+                tasks = [
+                    tg.create_task(self.get_rating_leaderboards_num(game_id, region, use_store=False))
+                    for region, game_id in accounts[i:i + MAX_BATCH_SIZE]
+                ]
+            ranked += sum(task.result() is not None for task in tasks)
+
+        _log.info(f'RatingLeaderboardAPI: prefetched {len(accounts)} accounts, {ranked} ranked')
+        return ranked
@@ -0,0 +1,114 @@
+import asyncio
+from typing import Any, Awaitable, Callable
+
+from lib.api.scheduler import RequestPriority, request_priority
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'APIBatcherLogger', 'logs/api_batcher.log')
+
+MAX_BATCH_SIZE = 100
+
+
+class MicroBatcher:
+    """
+    Groups single-account requests to a list endpoint (e.g. `wotb/account/info/`) into
+    one request per region and chunk of up to `max_batch` ids.
+
+    Requests are collected for `window` seconds (or until a chunk is full), then the chunk
+    is fetched with `fetch_chunk` and the results are fanned out to the individual awaiters.
+    A chunk is sent with the highest priority among its requesters.
+    """
+    def __init__(
+            self,
+            name: str,
+            fetch_chunk: Callable[[str, list[int]], Awaitable[dict[str, Any]]],
+            window: float = 0.02,
+            max_batch: int = MAX_BATCH_SIZE
+        ) -> None:
+        """
+        Args:
+            name (str): The batcher name used in logs.
+            fetch_chunk (Callable): Coroutine function taking a region and a list of account ids and
+                returning the `data` section of the API response keyed by account id.
+            window (float, optional): Collection window in seconds. Defaults to 0.02.
+            max_batch (int, optional): Maximum ids per request. Defaults to 100.
+        """
+        self.name = name
+        self.window = window
+        self.max_batch = min(max_batch, MAX_BATCH_SIZE)
+        self._fetch_chunk = fetch_chunk
+
+        self._pending: dict[str, dict[int, list[asyncio.Future]]] = {}
+        self._priorities: dict[str, RequestPriority] = {}
+        self._timers: dict[str, asyncio.TimerHandle] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+        self.requested = 0
+        self.requests_sent = 0
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'requested': self.requested,
+            'requests_sent': self.requests_sent,
+            'pending': sum(len(ids) for ids in self._pending.values()),
+        }
+
+    async def get(self, region: str, account_id: int | str) -> Any:
+        """
+        Queues one account id and waits for its part of the batched response.
+
+        Args:
+            region (str): The normalized region of the account.
+            account_id (int | str): The account id.
+
+        Returns:
+            Any: The `data` entry of the account, None if the API returned nothing for it.
+        """
+        account_id = int(account_id)
+        future = asyncio.get_running_loop().create_future()
+        pending = self._pending.setdefault(region, {})
+        pending.setdefault(account_id, []).append(future)
+        self._priorities[region] = min(self._priorities.get(region, RequestPriority.BACKGROUND), request_priority.get())
+        self.requested += 1
+
+        if len(pending) >= self.max_batch:
+            self._flush(region)
+        elif region not in self._timers:
+            self._timers[region] = asyncio.get_running_loop().call_later(self.window, self._flush, region)
+
+        return await future
+
+    def _flush(self, region: str) -> None:
+        timer = self._timers.pop(region, None)
+        if timer is not None:
+            timer.cancel()
+
+        pending = self._pending.pop(region, {})
+        priority = self._priorities.pop(region, RequestPriority.INTERACTIVE)
+        ids = list(pending)
+
+        for i in range(0, len(ids), self.max_batch):
+            chunk = {account_id: pending[account_id] for account_id in ids[i:i + self.max_batch]}
+            task = asyncio.create_task(self._run_chunk(region, chunk, priority))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run_chunk(self, region: str, chunk: dict[int, list[asyncio.Future]], priority: RequestPriority) -> None:
+        request_priority.set(priority)
+        self.requests_sent += 1
+        _log.debug(f'{self.name}: fetching {len(chunk)} accounts in {region}')
+
+        try:
+            data = await self._fetch_chunk(region, list(chunk))
+        except Exception as error:
+            for futures in chunk.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(error)
+            return
+
+        for account_id, futures in chunk.items():
+            result = data.get(str(account_id)) if data else None
+            for future in futures:
+                if not future.done():
+                    future.set_result(result)
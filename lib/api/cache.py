@@ -0,0 +1,229 @@
+from collections import OrderedDict
+from enum import Enum, auto
+from time import monotonic
+from typing import Any, Hashable
+
+from lib.data_classes.api.api_data import PlayerGlobalData
+from lib.data_classes.api.tanks_stats import TankStats
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'PlayerStatsCacheLogger', 'logs/player_stats_cache.log')
+
+
+class CacheState(Enum):
+    MISS = auto()
+    FRESH = auto()
+    STALE = auto()
+
+
+class _CacheEntry:
+    __slots__ = ('value', 'size', 'stored_at')
+
+    def __init__(self, value: PlayerGlobalData, size: int) -> None:
+        self.value = value
+        self.size = size
+        self.stored_at = monotonic()
+
+
+class PlayerStatsCache:
+    """
+    Byte-size bounded LRU cache of validated `PlayerGlobalData` objects.
+
+    An entry is fresh for `ttl` seconds, then stale for `stale_ttl` more seconds. A stale entry
+    can still be served while the caller refreshes it in background (stale-while-revalidate),
+    after that it counts as a miss and is dropped.
+    """
+    def __init__(self, max_bytes: int, ttl: int, stale_ttl: int = 0) -> None:
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+
+        self._entries: OrderedDict[Hashable, _CacheEntry] = OrderedDict()
+        self.size_bytes = 0
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @staticmethod
+    def make_key(account_id: int | str, region: str, fields: Hashable = 'all') -> tuple:
+        return (int(account_id), region, fields)
+
+    @staticmethod
+    def _get_size(value: PlayerGlobalData) -> int:
+        return len(value.__pydantic_serializer__.to_json(value))
+
+    def get(self, key: Hashable) -> tuple[PlayerGlobalData | None, CacheState]:
+        """
+        Looks up an entry and marks it as recently used.
+
+        Args:
+            key (Hashable): The cache key, see `make_key`.
+
+        Returns:
+            tuple[PlayerGlobalData | None, CacheState]: The cached value (None on miss) and its state.
+        """
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None, CacheState.MISS
+
+        age = monotonic() - entry.stored_at
+        if age > self.ttl + self.stale_ttl:
+            self._remove(key)
+            self.expirations += 1
+            self.misses += 1
+            return None, CacheState.MISS
+
+        self._entries.move_to_end(key)
+        if age > self.ttl:
+            self.stale_hits += 1
+            return entry.value, CacheState.STALE
+
+        self.hits += 1
+        return entry.value, CacheState.FRESH
+
+    def set(self, key: Hashable, value: PlayerGlobalData) -> None:
+        size = self._get_size(value)
+        if size > self.max_bytes:
+            _log.warning(f'Entry {key} ({size} bytes) is larger than the whole cache, skipping')
+            return
+
+        if key in self._entries:
+            self._remove(key)
+
+        self._entries[key] = _CacheEntry(value, size)
+        self.size_bytes += size
+
+        while self.size_bytes > self.max_bytes:
+            evicted_key, _ = next(iter(self._entries.items()))
+            self._remove(evicted_key)
+            self.evictions += 1
+
+    def invalidate(self, key: Hashable) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size_bytes = 0
+
+    def _remove(self, key: Hashable) -> None:
+        entry = self._entries.pop(key)
+        self.size_bytes -= entry.size
+
+    def get_counters(self) -> dict[str, int | float]:
+        lookups = self.hits + self.stale_hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'size_bytes': self.size_bytes,
+            'hits': self.hits,
+            'stale_hits': self.stale_hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'hit_rate': round((self.hits + self.stale_hits) / lookups, 3) if lookups else 0.0,
+        }
+
+
+class _TankSnapshot:
+    __slots__ = ('marker', 'tanks')
+
+    def __init__(self, marker: tuple, tanks: dict[str, TankStats]) -> None:
+        self.marker = marker
+        self.tanks = tanks
+
+
+class TankStatsSnapshots:
+    """
+    LRU store of the last validated tank map of each account, for incremental tank stats refresh.
+
+    A snapshot is tagged with a marker of the account state it was taken at (battles count and
+    `last_battle_time` from `wotb/account/info/`). While the marker is unchanged, the tank map
+    is reused without a request. Otherwise only the rows whose `last_battle_time` moved are
+    validated again, the others are taken from the snapshot.
+    """
+    def __init__(self, max_entries: int) -> None:
+        self.max_entries = max_entries
+        self._entries: OrderedDict[Hashable, _TankSnapshot] = OrderedDict()
+
+        self.unchanged = 0
+        self.rows_reused = 0
+        self.rows_validated = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def get_unchanged(self, key: Hashable, marker: tuple) -> dict[str, TankStats] | None:
+        """
+        Returns a copy of the snapshot tank map if the account hasn't played since it was taken.
+
+        Args:
+            key (Hashable): The account key, `(account_id, region)`.
+            marker (tuple): The current account state marker.
+
+        Returns:
+            dict[str, TankStats] | None: The tank map, None if it has to be fetched.
+        """
+        snapshot = self._entries.get(key)
+        if snapshot is None or snapshot.marker != marker:
+            return None
+
+        self._entries.move_to_end(key)
+        self.unchanged += 1
+        return dict(snapshot.tanks)
+
+    def merge(self, key: Hashable, marker: tuple, rows: list[dict[str, Any]]) -> dict[str, TankStats]:
+        """
+        Builds the tank map from fresh API rows, validating only the rows changed since the snapshot.
+
+        Args:
+            key (Hashable): The account key, `(account_id, region)`.
+            marker (tuple): The current account state marker.
+            rows (list[dict[str, Any]]): The `wotb/tanks/stats/` rows of the account.
+
+        Returns:
+            dict[str, TankStats]: The tank map keyed by tank id.
+        """
+        snapshot = self._entries.get(key)
+        previous = snapshot.tanks if snapshot is not None else {}
+
+        tanks: dict[str, TankStats] = {}
+        for row in rows:
+            tank_id = str(row['tank_id'])
+            tank = previous.get(tank_id)
+
+            if tank is not None and tank.last_battle_time == row['last_battle_time']:
+                self.rows_reused += 1
+            else:
+                tank = TankStats.model_validate(row)
+                self.rows_validated += 1
+            tanks[tank_id] = tank
+
+        self.set(key, marker, tanks)
+        return dict(tanks)
+
+    def set(self, key: Hashable, marker: tuple, tanks: dict[str, TankStats]) -> None:
+        self._entries.pop(key, None)
+        self._entries[key] = _TankSnapshot(marker, dict(tanks))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'unchanged': self.unchanged,
+            'rows_reused': self.rows_reused,
+            'rows_validated': self.rows_validated,
+        }
@@ -0,0 +1,98 @@
+from enum import Enum
+from time import monotonic
+
+from lib.exceptions import api as api_exceptions
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config
+
+_log = get_logger(__file__, 'APICircuitBreakerLogger', 'logs/api_circuit_breaker.log')
+_config = Config().get()
+
+
+class CircuitState(Enum):
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker of one regional API endpoint.
+
+    After `failure_threshold` failures in a row (timeouts, connection errors, 5xx,
+    `SOURCE_NOT_AVAILABLE`) the circuit opens and every request fails fast with
+    `APISourceNotAvailable`. After `recovery_timeout` seconds up to `half_open_probes`
+    requests are let through: a success closes the circuit, a failure opens it again.
+    """
+    def __init__(self, region: str) -> None:
+        breaker_config = _config.game_api.circuit_breaker
+        self.region = region
+        self.failure_threshold = breaker_config.failure_threshold
+        self.recovery_timeout = breaker_config.recovery_timeout
+        self.half_open_probes = breaker_config.half_open_probes
+
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.probes = 0
+        self._opened_at = 0.0
+
+        self.opened = 0
+        self.rejected = 0
+
+    def before_request(self) -> None:
+        """
+        Reserves a request slot.
+
+        Raises:
+            APISourceNotAvailable: If the circuit is open, or half-open with all probes in flight.
+        """
+        if self.state is CircuitState.OPEN:
+            if monotonic() - self._opened_at < self.recovery_timeout:
+                self.rejected += 1
+                raise api_exceptions.APISourceNotAvailable(f'Circuit of {self.region} is open')
+
+            self.state = CircuitState.HALF_OPEN
+            self.probes = 0
+            _log.info(f'Circuit of {self.region} is half-open, probing')
+
+        if self.state is CircuitState.HALF_OPEN:
+            if self.probes >= self.half_open_probes:
+                self.rejected += 1
+                raise api_exceptions.APISourceNotAvailable(f'Circuit of {self.region} is half-open')
+            self.probes += 1
+
+    def record_success(self) -> None:
+        if self.state is CircuitState.HALF_OPEN:
+            _log.info(f'Circuit of {self.region} is closed')
+        self.state = CircuitState.CLOSED
+        self.failures = 0
+        self.probes = 0
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.state is CircuitState.HALF_OPEN or self.failures >= self.failure_threshold:
+            self._open()
+
+    def release(self) -> None:
+        """
+        Frees the slot of a request that ended without an outcome (e.g. cancelled).
+        """
+        if self.state is CircuitState.HALF_OPEN and self.probes > 0:
+            self.probes -= 1
+
+    def _open(self) -> None:
+        if self.state is not CircuitState.OPEN:
+            self.opened += 1
+            _log.warning(f'Circuit of {self.region} is open after {self.failures} failures, '
+                         f'failing fast for {self.recovery_timeout}s')
+        self.state = CircuitState.OPEN
+        self._opened_at = monotonic()
+        self.probes = 0
+
+    def get_counters(self) -> dict[str, int | str]:
+        return {
+            'state': self.state.value,
+            'failures': self.failures,
+            'opened': self.opened,
+            'rejected': self.rejected,
+        }
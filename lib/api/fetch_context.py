@@ -0,0 +1,33 @@
+from time import time
+from typing import Any
+
+
+class PlayerFetchContext:
+    """
+    Per-call state of a single `API.get_stats` run.
+
+    Every sub-fetcher (`get_player_stats`, `get_player_clan_stats`, `get_player_achievements`,
+    `get_player_tanks_stats`) writes its part of the player data here and returns the context.
+    Nothing request-specific is stored on the `API` singleton, so any number of overlapping
+    `get_stats` calls can share one event loop.
+
+    `account_info` holds the `wotb/account/info/` data of the player when the caller already
+    has it, sub-fetchers use it instead of requesting it again.
+    """
+    __slots__ = ('region', 'account_id', 'account_info', 'start_time', 'player_stats')
+
+    def __init__(
+            self,
+            region: str,
+            account_id: int | str,
+            account_info: dict[str, Any] | None = None
+        ) -> None:
+        self.region = region
+        self.account_id = account_id
+        self.account_info = account_info
+        self.start_time = time()
+        self.player_stats: dict[str, Any] = {}
+
+    @property
+    def elapsed(self) -> float:
+        return time() - self.start_time
@@ -0,0 +1,27 @@
+from enum import Flag, auto
+
+
+class StatsFields(Flag):
+    """
+    Parts of the player data `API.get_stats` has to fetch.
+
+    Every part maps to the API endpoint it comes from, parts that aren't requested are not
+    fetched and stay None in the returned `PlayerGlobalData`:
+
+    - `STATISTICS`: `statistics.all` from `wotb/account/info/`.
+    - `RATING`: `statistics.rating`, same request as `STATISTICS`.
+    - `TANKS`: `tank_stats` from `wotb/tanks/stats/`.
+    - `ACHIEVEMENTS`: `achievements` from `wotb/account/achievements/`.
+    - `CLAN`: `clan_tag` and `clan_stats` from `wotb/clans/accountinfo/`.
+
+    Usage Example:
+        >>> await API().get_stats(region='eu', game_id=123, fields=StatsFields.TOTALS)
+    """
+    STATISTICS = auto()
+    RATING = auto()
+    TANKS = auto()
+    ACHIEVEMENTS = auto()
+    CLAN = auto()
+
+    TOTALS = STATISTICS | RATING
+    ALL = STATISTICS | RATING | TANKS | ACHIEVEMENTS | CLAN
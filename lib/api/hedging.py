@@ -0,0 +1,64 @@
+import asyncio
+from collections import deque
+from typing import Any, Awaitable, Callable
+
+
+class LatencyTracker:
+    """
+    Sliding window of the latest request latencies of one region.
+    """
+    def __init__(self, window: int, min_samples: int) -> None:
+        self.min_samples = min_samples
+        self._samples: deque[float] = deque(maxlen=window)
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """
+        Returns the `q` latency percentile, None until `min_samples` latencies are recorded.
+        """
+        if len(self._samples) < self.min_samples:
+            return None
+
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+
+async def hedged(func: Callable[[], Awaitable[Any]], delay: float) -> tuple[Any, bool]:
+    """
+    Runs `func`, and a duplicate of it if the first attempt isn't done after `delay` seconds.
+
+    The first successful attempt wins and the other one is cancelled. If both fail, the
+    exception of the last one is raised.
+
+    Args:
+        func (Callable[[], Awaitable[Any]]): Factory of the request coroutine.
+        delay (float): Seconds to wait before sending the duplicate.
+
+    Returns:
+        tuple[Any, bool]: The result and whether the duplicate was sent.
+    """
+    primary = asyncio.ensure_future(func())
+    pending = {primary}
+    hedge_sent = False
+
+    try:
+        done, pending = await asyncio.wait(pending, timeout=delay)
+        if done:
+            return primary.result(), hedge_sent
+
+        pending.add(asyncio.ensure_future(func()))
+        hedge_sent = True
+
+        error = None
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    return task.result(), hedge_sent
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
@@ -0,0 +1,50 @@
+from time import monotonic
+
+from lib.data_classes.api.rating_leaderboard import RatingLeaderboardAPIResponse
+
+# Normalized API region -> region of the `<region>.wotblitz.com` leaderboard host
+LEADERBOARD_REGIONS = {'eu': 'eu', 'asia': 'asia', 'com': 'na'}
+
+
+class RatingLeaderboardStore:
+    """
+    Store of rating leaderboard entries keyed by `(region, account_id)`.
+
+    Filled in bulk by `RatingLeaderboardWorker` and on demand by `API.get_rating_leaderboards_num`,
+    so renders read positions with a dict lookup instead of waiting for the leaderboard endpoint.
+    Unranked accounts are stored as None, so they aren't requested again before `max_age`.
+    """
+    def __init__(self, max_age: int) -> None:
+        self.max_age = max_age
+        self._entries: dict[tuple[str, int], tuple[RatingLeaderboardAPIResponse | None, float]] = {}
+
+        self.hits = 0
+        self.misses = 0
+
+    def __contains__(self, key: tuple[str, int]) -> bool:
+        entry = self._entries.get(key)
+        return entry is not None and monotonic() - entry[1] < self.max_age
+
+    def get(self, region: str, account_id: int | str) -> RatingLeaderboardAPIResponse | None:
+        entry = self._entries.get((region, int(account_id)))
+        if entry is None or monotonic() - entry[1] >= self.max_age:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry[0]
+
+    def get_position(self, region: str, account_id: int | str) -> int | None:
+        entry = self.get(region, account_id)
+        return entry.number if entry is not None else None
+
+    def set(self, region: str, account_id: int | str, entry: RatingLeaderboardAPIResponse | None) -> None:
+        self._entries[(region, int(account_id))] = (entry, monotonic())
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'entries': len(self._entries),
+            'ranked': sum(entry is not None for entry, _ in self._entries.values()),
+            'hits': self.hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,136 @@
+from time import monotonic
+
+from lib.exceptions import api as api_exceptions
+
+# `wotb/account/list/` returns at most this many accounts without a `limit`
+SEARCH_LIMIT = 100
+NEGATIVE_ERRORS = (api_exceptions.NoPlayersFound, api_exceptions.UncorrectName)
+
+
+class NicknameIndex:
+    """
+    Resolution index of `(region, lower_nickname) -> account_id`, in front of `wotb/account/list/`.
+
+    - Exact nicknames are kept for `ttl` seconds, learnt from every search and seeded from the
+      game accounts of `PlayersDB`.
+    - Failed searches (`NoPlayersFound`, `UncorrectName`) are kept for `negative_ttl` seconds and
+      raise the same error again without a request.
+    - `startswith` results are kept per prefix. A complete result (less than `SEARCH_LIMIT`
+      accounts) of a prefix also answers every longer prefix, by filtering.
+    """
+    def __init__(self, ttl: int, negative_ttl: int, max_entries: int) -> None:
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self.max_entries = max_entries
+
+        self._exact: dict[tuple[str, str], tuple[int, float]] = {}
+        self._prefixes: dict[tuple[str, str], tuple[list[dict], float]] = {}
+        self._negative: dict[tuple[str, str, bool], tuple[type[api_exceptions.APIError], float]] = {}
+
+        self.hits = 0
+        self.prefix_hits = 0
+        self.negative_hits = 0
+        self.misses = 0
+
+    def _alive(self, stored_at: float, ttl: int) -> bool:
+        return monotonic() - stored_at < ttl
+
+    def add(self, region: str, nickname: str, account_id: int) -> None:
+        if len(self._exact) >= self.max_entries:
+            self._exact.pop(next(iter(self._exact)))
+        self._exact[(region, nickname.lower())] = (int(account_id), monotonic())
+        self._negative.pop((region, nickname.lower(), True), None)
+
+    def forget(self, region: str, nickname: str) -> None:
+        self._exact.pop((region, nickname.lower()), None)
+
+    def add_search(self, region: str, search: str, exact: bool, accounts: list[dict]) -> None:
+        """
+        Learns the accounts returned by a successful `wotb/account/list/` search.
+        """
+        for account in accounts:
+            self.add(region, account['nickname'], account['account_id'])
+
+        if not exact:
+            if len(self._prefixes) >= self.max_entries:
+                self._prefixes.pop(next(iter(self._prefixes)))
+            self._prefixes[(region, search.lower())] = (accounts, monotonic())
+
+    def add_negative(self, region: str, search: str, exact: bool, error: api_exceptions.APIError) -> None:
+        if len(self._negative) >= self.max_entries:
+            self._negative.pop(next(iter(self._negative)))
+        self._negative[(region, search.lower(), exact)] = (type(error), monotonic())
+
+    def lookup(self, region: str, search: str, exact: bool) -> int | None:
+        """
+        Resolves a nickname search without a request.
+
+        Args:
+            region (str): The normalized region.
+            search (str): The searched nickname.
+            exact (bool): Whether the search is exact or `startswith`.
+
+        Raises:
+            NoPlayersFound | UncorrectName: If the same search failed less than `negative_ttl` seconds ago,
+                or a complete result of a shorter prefix has no match.
+
+        Returns:
+            int | None: The account id of the first match, None if the API has to be asked.
+        """
+        search = search.lower()
+
+        negative = self._negative.get((region, search, exact))
+        if negative is not None:
+            error, stored_at = negative
+            if self._alive(stored_at, self.negative_ttl):
+                self.negative_hits += 1
+                raise error(f'No players found for {search} (cached)')
+            del self._negative[(region, search, exact)]
+
+        if exact:
+            entry = self._exact.get((region, search))
+            if entry is not None and self._alive(entry[1], self.ttl):
+                self.hits += 1
+                return entry[0]
+        else:
+            accounts = self.prefix(region, search)
+            if accounts is not None:
+                self.prefix_hits += 1
+                if not accounts:
+                    raise api_exceptions.NoPlayersFound(f'No players found for {search} (cached)')
+                return accounts[0]['account_id']
+
+        self.misses += 1
+        return None
+
+    def prefix(self, region: str, search: str) -> list[dict] | None:
+        """
+        Returns the accounts whose nickname starts with `search`, in the API order.
+
+        Returns:
+            list[dict] | None: The `wotb/account/list/` items, None if no known result covers the prefix.
+        """
+        search = search.lower()
+
+        entry = self._prefixes.get((region, search))
+        if entry is not None and self._alive(entry[1], self.ttl):
+            return entry[0]
+
+        for length in range(len(search) - 1, 0, -1):
+            entry = self._prefixes.get((region, search[:length]))
+            if entry is None or not self._alive(entry[1], self.ttl) or len(entry[0]) >= SEARCH_LIMIT:
+                continue
+            return [account for account in entry[0] if account['nickname'].lower().startswith(search)]
+
+        return None
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'nicknames': len(self._exact),
+            'prefixes': len(self._prefixes),
+            'negative': len(self._negative),
+            'hits': self.hits,
+            'prefix_hits': self.prefix_hits,
+            'negative_hits': self.negative_hits,
+            'misses': self.misses,
+        }
@@ -0,0 +1,153 @@
+import asyncio
+from time import monotonic
+
+from lib.exceptions import api as api_exceptions
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config, EnvConfig
+
+_log = get_logger(__file__, 'APIRateLimiterLogger', 'logs/api_rate_limiter.log')
+_config = Config().get()
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float | None = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else rate
+        self.tokens = self.capacity
+        self.waiting = 0
+        self._updated = monotonic()
+
+    def _refill(self) -> None:
+        now = monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def expected_wait(self) -> float:
+        """
+        Seconds a new request would wait for a token, counting the already waiting ones.
+        """
+        self._refill()
+        return max(0.0, (self.waiting + 1 - self.tokens) / self.rate)
+
+    async def acquire(self) -> None:
+        self.waiting += 1
+        try:
+            while True:
+                self._refill()
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+        finally:
+            self.waiting -= 1
+
+
+class AppIdBudget(TokenBucket):
+    """
+    Token bucket of one application ID in one region with AIMD rate control: the rate is
+    multiplied by `backoff` on `REQUEST_LIMIT_EXCEEDED` and probed up by `increase_step`
+    after `probe_after` clean responses in a row.
+    """
+    def __init__(self, app_id: str, region: str) -> None:
+        limits = _config.game_api.rate_limit
+        super().__init__(limits.rate)
+
+        self.app_id = app_id
+        self.region = region
+        self.min_rate = limits.min_rate
+        self.max_rate = limits.max_rate
+        self.backoff = limits.backoff
+        self.increase_step = limits.increase_step
+        self.probe_after = limits.probe_after
+
+        self.clean_responses = 0
+        self.limit_exceeded = 0
+
+    def report_success(self) -> None:
+        self.clean_responses += 1
+        if self.clean_responses >= self.probe_after and self.rate < self.max_rate:
+            self.rate = min(self.max_rate, self.rate + self.increase_step)
+            self.capacity = self.rate
+            self.clean_responses = 0
+
+    def report_limit_exceeded(self) -> None:
+        self.limit_exceeded += 1
+        self.clean_responses = 0
+        self.rate = max(self.min_rate, self.rate * self.backoff)
+        self.capacity = self.rate
+        self.tokens = 0
+        _log.warning(f'Request limit exceeded for app ID {self.app_id[:6]}... in {self.region}, '
+                     f'rate lowered to {self.rate:.1f} rps')
+
+
+class AdaptiveRateLimiter:
+    """
+    Rate limiter with one adaptive token bucket per application ID per region.
+
+    `acquire` picks the application ID with the shortest expected wait instead of cycling
+    through them blindly, so a throttled ID is naturally avoided until it recovers.
+    """
+    def __init__(self) -> None:
+        self._app_ids = {
+            'ru': EnvConfig.LT_APP_IDS,
+            'eu': EnvConfig.WG_APP_IDS,
+            'com': EnvConfig.WG_APP_IDS,
+            'asia': EnvConfig.WG_APP_IDS,
+        }
+        self._budgets: dict[tuple[str, str], AppIdBudget] = {}
+
+    @staticmethod
+    def normalize_region(region: str) -> str:
+        region = region.lower()
+        if region in {'ru', 'eu', 'asia'}:
+            return region
+        if region in {'na', 'com'}:
+            return 'com'
+        if region == 'as':
+            return 'asia'
+        raise api_exceptions.UncorrectRegion(f'Uncorrect region: {region}')
+
+    def _get_budget(self, region: str, app_id: str) -> AppIdBudget:
+        key = (region, app_id)
+        budget = self._budgets.get(key)
+        if budget is None:
+            budget = self._budgets[key] = AppIdBudget(app_id, region)
+        return budget
+
+    async def acquire(self, region: str) -> str:
+        """
+        Waits for a request slot in the region and returns the application ID to use.
+
+        Args:
+            region (str): The region of the request.
+
+        Raises:
+            UncorrectRegion: If the region is unknown.
+
+        Returns:
+            str: The application ID the request must be sent with.
+        """
+        region = self.normalize_region(region)
+        budgets = [self._get_budget(region, app_id) for app_id in self._app_ids[region]]
+        if not budgets:
+            raise api_exceptions.APIError(f'No application IDs configured for {region}')
+
+        budget = min(budgets, key=lambda b: b.expected_wait())
+        await budget.acquire()
+        return budget.app_id
+
+    def report_success(self, region: str, app_id: str) -> None:
+        self._get_budget(self.normalize_region(region), app_id).report_success()
+
+    def report_limit_exceeded(self, region: str, app_id: str) -> None:
+        self._get_budget(self.normalize_region(region), app_id).report_limit_exceeded()
+
+    def get_counters(self) -> dict[str, dict]:
+        return {
+            f'{region}:{app_id[:6]}': {
+                'rate': round(budget.rate, 2),
+                'waiting': budget.waiting,
+                'limit_exceeded': budget.limit_exceeded,
+            }
+            for (region, app_id), budget in self._budgets.items()
+        }
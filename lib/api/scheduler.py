@@ -0,0 +1,139 @@
+import asyncio
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import Iterator
+
+from lib.api.rate_limiter import AdaptiveRateLimiter
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config
+
+_log = get_logger(__file__, 'APISchedulerLogger', 'logs/api_scheduler.log')
+_config = Config().get()
+
+
+class RequestPriority(IntEnum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+request_priority: ContextVar[RequestPriority] = ContextVar('request_priority', default=RequestPriority.INTERACTIVE)
+
+
+@contextmanager
+def background_priority() -> Iterator[None]:
+    """
+    Marks every API request made inside the block (and in tasks created from it) as background.
+
+    Usage Example:
+        >>> with background_priority():
+        ...     await API().get_stats(region='eu', game_id=123)
+    """
+    token = request_priority.set(RequestPriority.BACKGROUND)
+    try:
+        yield
+    finally:
+        request_priority.reset(token)
+
+
+class _RegionQueue:
+    def __init__(self) -> None:
+        self.queues: dict[RequestPriority, deque[asyncio.Future]] = {p: deque() for p in RequestPriority}
+        self.busy = False
+        self.interactive_streak = 0
+
+        self.granted = {p: 0 for p in RequestPriority}
+        self.max_depth = {p: 0 for p in RequestPriority}
+        self.promotions = 0
+
+    def waiting(self, priority: RequestPriority) -> int:
+        return sum(not future.done() for future in self.queues[priority])
+
+
+class PriorityScheduler:
+    """
+    Orders outbound requests of each region by priority before they reach the rate limiter.
+
+    Only one request per region waits for a rate limiter token at a time, the others queue
+    here. Interactive requests are always granted first, except that after `starvation_limit`
+    interactive grants in a row a waiting background request is let through.
+    """
+    def __init__(self, rate_limiter: AdaptiveRateLimiter) -> None:
+        self.rate_limiter = rate_limiter
+        self.starvation_limit = _config.game_api.scheduler.starvation_limit
+        self._regions: dict[str, _RegionQueue] = {}
+
+    def _get_region(self, region: str) -> _RegionQueue:
+        region = self.rate_limiter.normalize_region(region)
+        state = self._regions.get(region)
+        if state is None:
+            state = self._regions[region] = _RegionQueue()
+        return state
+
+    async def acquire(self, region: str, priority: RequestPriority | None = None) -> str:
+        """
+        Waits for the turn of the request, then for a rate limiter slot.
+
+        Args:
+            region (str): The region of the request.
+            priority (RequestPriority | None, optional): The request priority. Defaults to the
+                priority of the current context, see `background_priority`.
+
+        Returns:
+            str: The application ID the request must be sent with.
+        """
+        priority = request_priority.get() if priority is None else priority
+        state = self._get_region(region)
+
+        if state.busy:
+            future = asyncio.get_running_loop().create_future()
+            queue = state.queues[priority]
+            queue.append(future)
+            state.max_depth[priority] = max(state.max_depth[priority], len(queue))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Turn was granted right before the cancellation, pass it on
+                    self._release(state)
+                raise
+        else:
+            state.busy = True
+
+        state.granted[priority] += 1
+        try:
+            return await self.rate_limiter.acquire(region)
+        finally:
+            self._release(state)
+
+    def _release(self, state: _RegionQueue) -> None:
+        interactive = state.queues[RequestPriority.INTERACTIVE]
+        background = state.queues[RequestPriority.BACKGROUND]
+
+        for queue in (interactive, background):
+            while queue and queue[0].done():
+                queue.popleft()
+
+        if background and (not interactive or state.interactive_streak >= self.starvation_limit):
+            if interactive:
+                state.promotions += 1
+            state.interactive_streak = 0
+            background.popleft().set_result(None)
+        elif interactive:
+            state.interactive_streak += 1
+            interactive.popleft().set_result(None)
+        else:
+            state.interactive_streak = 0
+            state.busy = False
+
+    def get_counters(self) -> dict[str, dict]:
+        return {
+            region: {
+                'queued': {p.name.lower(): state.waiting(p) for p in RequestPriority},
+                'max_queued': {p.name.lower(): state.max_depth[p] for p in RequestPriority},
+                'granted': {p.name.lower(): state.granted[p] for p in RequestPriority},
+                'starvation_promotions': state.promotions,
+            }
+            for region, state in self._regions.items()
+        }
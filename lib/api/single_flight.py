@@ -0,0 +1,68 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Hashable
+
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'SingleFlightLogger', 'logs/single_flight.log')
+
+
+class SingleFlight:
+    """
+    Coalesces identical in-flight requests.
+
+    The first caller for a key starts the fetch, every concurrent caller with the same key
+    awaits the same task and receives the same result (or exception). The task is shielded,
+    so a cancelled caller doesn't cancel the fetch for the others.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self._in_flight: dict[Hashable, asyncio.Task] = {}
+
+        self.calls = 0
+        self.deduplicated = 0
+
+    @property
+    def in_flight(self) -> int:
+        return len(self._in_flight)
+
+    def is_in_flight(self, key: Hashable) -> bool:
+        return key in self._in_flight
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'calls': self.calls,
+            'deduplicated': self.deduplicated,
+            'in_flight': self.in_flight,
+        }
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Runs `func` once per `key` at a time and shares the result with all concurrent callers.
+
+        Args:
+            key (Hashable): The key identifying identical requests.
+            func (Callable[[], Awaitable[Any]]): Factory of the coroutine performing the fetch.
+
+        Returns:
+            Any: The result of the fetch.
+        """
+        task = self._in_flight.get(key)
+
+        if task is None:
+            self.calls += 1
+            task = asyncio.ensure_future(func())
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._on_done(key, t))
+        else:
+            self.deduplicated += 1
+            _log.debug(f'{self.name}: joined in-flight request {key}')
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+
+        # Mark the exception as retrieved, callers may all have been cancelled
+        if not task.cancelled():
+            task.exception()
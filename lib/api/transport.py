@@ -0,0 +1,170 @@
+import json
+import os
+from abc import ABC, abstractmethod
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config
+
+_log = get_logger(__file__, 'APITransportLogger', 'logs/api_transport.log')
+_config = Config().get()
+
+
+class TransportResponse:
+    __slots__ = ('status', 'body')
+
+    def __init__(self, status: int, body: bytes) -> None:
+        self.status = status
+        self.body = body
+
+
+class Transport(ABC):
+    """
+    Sends the GET requests of the API client, see `get_transport` for the available ones.
+    """
+    @abstractmethod
+    async def get(self, url: str) -> TransportResponse:
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+def clean_url(url: str) -> str:
+    """
+    Removes the whitespace that folded YAML scalars leave in the urls of settings.yaml,
+    e.g. `/wotb/account/list/ ?application_id=...`.
+    """
+    return ''.join(url.split())
+
+
+def fixture_name(url: str) -> str:
+    """
+    Returns the fixture name of an API url, e.g. `account_info` for `/wotb/account/info/`.
+    """
+    return urlsplit(url).path.strip('/').removeprefix('wotb/').replace('/', '_')
+
+
+class HttpTransport(Transport):
+    """
+    Sends requests over HTTP with one long-lived keep-alive session per host.
+
+    Every host gets its own connector, so a slow region can't exhaust the connection pool
+    of the others. With `base_url` every request is sent to that server instead of the host
+    of the url (e.g. the local API stub), with `record_dir` every successful response is
+    merged into the fixture of its endpoint.
+    """
+    def __init__(self, base_url: str | None = None, record_dir: str | None = None) -> None:
+        self.base_url = base_url.rstrip('/') if base_url else None
+        self.record_dir = record_dir
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+
+    def get_session(self, host: str) -> aiohttp.ClientSession:
+        """
+        Returns the pooled session for the given host, creating it on first use.
+
+        Args:
+            host (str): The host, e.g. `api.wotblitz.eu`.
+
+        Returns:
+            aiohttp.ClientSession: The pooled session for this host.
+        """
+        session = self._sessions.get(host)
+        if session is None or session.closed:
+            conn_config = _config.game_api.connection
+            connector = aiohttp.TCPConnector(
+                limit=conn_config.limit,
+                limit_per_host=conn_config.limit_per_host,
+                ttl_dns_cache=conn_config.ttl_dns_cache,
+                keepalive_timeout=conn_config.keepalive_timeout,
+                ssl=False
+            )
+            session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=conn_config.timeout)
+            )
+            self._sessions[host] = session
+            _log.debug(f'Opened pooled session for {host}')
+        return session
+
+    async def get(self, url: str) -> TransportResponse:
+        url = clean_url(url)
+        parts = urlsplit(url)
+        if self.base_url is not None:
+            url = f'{self.base_url}{parts.path}?{parts.query}'
+            parts = urlsplit(url)
+
+        async with self.get_session(parts.netloc).get(url) as response:
+            result = TransportResponse(response.status, await response.read())
+
+        if self.record_dir is not None and result.status == 200:
+            self._record(url, result.body)
+        return result
+
+    def _record(self, url: str, body: bytes) -> None:
+        try:
+            data = json.loads(body)
+        except ValueError:
+            return
+        if data.get('status') != 'ok' or not data.get('data'):
+            return
+
+        path = os.path.join(self.record_dir, f'{fixture_name(url)}.json')
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as file:
+                recorded = json.load(file)
+            if isinstance(data['data'], dict):
+                recorded['data'].update(data['data'])
+            else:
+                known = {item['account_id'] for item in recorded['data']}
+                recorded['data'].extend(item for item in data['data'] if item['account_id'] not in known)
+            data = recorded
+
+        os.makedirs(self.record_dir, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as file:
+            json.dump(data, file, ensure_ascii=False)
+
+    async def close(self) -> None:
+        for host, session in self._sessions.items():
+            if not session.closed:
+                await session.close()
+                _log.debug(f'Closed pooled session for {host}')
+        self._sessions.clear()
+
+
+class FixtureTransport(Transport):
+    """
+    Answers requests in-process from the recorded fixtures of the API stub, without any network.
+    """
+    def __init__(self, fixtures_dir: str, **stub_options) -> None:
+        from dev_tools.api_stub.stub_api import StubApi
+
+        self.stub = StubApi(fixtures_dir, **stub_options)
+
+    async def get(self, url: str) -> TransportResponse:
+        parts = urlsplit(clean_url(url))
+        status, body = await self.stub.handle(parts.path, parts.query)
+        return TransportResponse(status, body)
+
+
+def get_transport() -> Transport:
+    """
+    Builds the transport selected by `game_api.transport` in settings.yaml.
+    """
+    transport_config = _config.game_api.transport
+
+    if transport_config.kind == 'fixtures':
+        _log.warning(f'Game API requests are served from the fixtures in {transport_config.fixtures_dir}')
+        return FixtureTransport(
+            transport_config.fixtures_dir,
+            players=transport_config.stub.players,
+            latency=transport_config.stub.latency,
+            limit_exceeded_rate=transport_config.stub.limit_exceeded_rate,
+            unavailable_rate=transport_config.stub.unavailable_rate
+        )
+
+    if transport_config.base_url:
+        _log.warning(f'Game API requests are sent to {transport_config.base_url}')
+    return HttpTransport(transport_config.base_url, transport_config.record_dir)
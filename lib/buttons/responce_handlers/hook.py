@@ -5,6 +5,7 @@ from lib.data_classes.api.api_data import PlayerGlobalData
 from lib.utils.string_parser import insert_data
 
 from lib.api import API
+from lib.api.fields import StatsFields
 from lib.locale.locale import Text
 from lib.buttons import Buttons
 from lib.buttons.functions import Functions
@@ -97,7 +98,8 @@ class HookHandlers:
 
         starting_value = _get_target_stats(hook.last_stats, hook.stats_type, hook.stats_name)
         current_value = _get_target_stats(await self.api.get_stats(region=hook.target_region, 
-                                                                   game_id=hook.last_stats.id), 
+                                                                   game_id=hook.last_stats.id,
+                                                                   fields=StatsFields.TOTALS), 
                                           hook.stats_type, 
                                           hook.stats_name)
         text = insert_data(Text().get().cmds.hook.sub_descr.hook_state, {
@@ -2,8 +2,9 @@ from typing import TYPE_CHECKING, Callable, Literal
 
 from aiogram.types import InlineKeyboardButton
 
-from lib.database.players import PlayersDB
 from lib.data_classes.db_player import DBPlayer
+from lib.exceptions.database import MemberNotFound
+from lib.utils.request_context import get_context_member
 
 from ..buttons.base import ButtonList
 
@@ -34,11 +35,12 @@ def make_buttons(member: DBPlayer, callback_data: str, ignored_slot: str = None)
     return ButtonList(buttons).format_data(1)
 
 def multi_accounts(callback_data: str, used_method: Literal["send_photo", "send_message"] = "send_message") -> Callable:
-    pdb = PlayersDB()
     def wrapper(func: Callable) -> Callable:
         async def wrapper2(fself, data: 'Message', bot: 'Bot', *args, **kwargs):
             ret_data = _handle_return_data(await func(fself, data, bot=bot, *args, **kwargs))
-            member = await pdb.get_member(data.from_user.id)
+            member = await get_context_member(data.from_user.id)
+            if member is None:
+                raise MemberNotFound()
             if member.has_more_than_one_account:
                 buttons = make_buttons(member, callback_data, member.current_game_account)
                 ret_data[1]["reply_markup"] = (buttons + ret_data[2]).get_keyboard()
@@ -10,12 +10,12 @@ from lib.data_classes.api.tanks_stats import TankStats
 
 
 class Player(BaseModel):
-    achievements: Achievements
+    achievements: Optional[Achievements] = None
     clan_stats: Optional[Clan] = None
-    tank_stats: Dict[str, TankStats]
+    tank_stats: Optional[Dict[str, TankStats]] = None
     statistics: Statistics
     name_and_tag: Optional[str] = None
-    clan_tag: Optional[str]
+    clan_tag: Optional[str] = None
 
 
 class PlayerGlobalData(BaseModel):
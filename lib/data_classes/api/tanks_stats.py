@@ -1,4 +1,4 @@
-from typing import Optional
+from typing import Dict, List, Literal, Optional
 
 from pydantic import BaseModel
 
@@ -44,3 +44,8 @@ class TankStats(BaseModel):
     battle_life_time: int
     in_garage: Optional[bool]
     tank_id: int
+
+
+class TanksStatsResponse(BaseModel):
+    status: Literal['ok']
+    data: Dict[str, Optional[List[TankStats]]]
@@ -121,11 +121,18 @@ class HookStats(BaseModel):
     lang: Optional[str] = None
 
 
+class SnapshotRef(BaseModel):
+    id: str
+    taken_at: datetime
+    winrate: Optional[float] = None
+
+
 class GameAccount(BaseModel):
     nickname: str
     game_id: int
     region: str
-    last_stats: Optional[PlayerGlobalData] = None
+    last_stats: Optional[PlayerGlobalData] = None  # Legacy, see `PlayersDB.move_last_stats_to_snapshots`
+    last_stats_ref: Optional[SnapshotRef] = None
     session_settings: SessionSettings = SessionSettings()
     image_settings: ImageSettings = ImageSettings()
     widget_settings: WidgetSettings = WidgetSettings()
@@ -133,6 +140,18 @@ class GameAccount(BaseModel):
     verified: bool = False
     locked: bool = False
 
+    @property
+    def has_last_stats(self) -> bool:
+        return self.last_stats_ref is not None or self.last_stats is not None
+
+    @property
+    def last_winrate(self) -> float | None:
+        if self.last_stats_ref is not None:
+            return self.last_stats_ref.winrate
+        if self.last_stats is not None:
+            return self.last_stats.data.statistics.all.winrate
+        return None
+
 
 def set_widget_settings(**kwargs) -> WidgetSettings:
     '''
@@ -230,3 +249,52 @@ class DBPlayer(BaseModel):
     @property
     def not_almsman(self) -> bool:
         return self.profile.premium
+
+
+class MemberHeader(BaseModel):
+    """
+    Scalar fields of a member, read with `MEMBER_HEADER_PROJECTION` instead of the whole document
+    (game accounts with their `last_stats`, base64 image, hook stats).
+    """
+    id: int
+    lang: Optional[str] = None
+    current_game_account: str = AccountSlotsEnum.slot_1.name
+    premium: bool = False
+    premium_time: Optional[datetime] = None
+    badges: List[str] = []
+    level_exp: int = 0
+    last_activity: datetime = datetime.now(pytz.utc)
+    commands_counter: int = 0
+
+    @property
+    def current_slot(self) -> AccountSlotsEnum:
+        return getattr(AccountSlotsEnum, self.current_game_account)
+
+    @classmethod
+    def from_document(cls, document: dict) -> 'MemberHeader':
+        return cls.model_validate({**document, **document.get('profile', {})})
+
+    @classmethod
+    def from_member(cls, member: DBPlayer) -> 'MemberHeader':
+        profile = member.profile
+        return cls.model_construct(
+            id=member.id,
+            lang=member.lang,
+            current_game_account=member.current_game_account,
+            premium=profile.premium,
+            premium_time=profile.premium_time,
+            badges=list(profile.badges),
+            level_exp=profile.level_exp,
+            last_activity=profile.last_activity,
+            commands_counter=profile.commands_counter
+        )
+
+
+MEMBER_HEADER_PROJECTION = {
+    '_id': 0,
+    'id': 1,
+    'lang': 1,
+    'current_game_account': 1,
+    **{f'profile.{field}': 1 for field in MemberHeader.model_fields if field in Profile.model_fields},
+}
+
@@ -4,7 +4,7 @@
 
 from __future__ import annotations
 
-from typing import List, Dict
+from typing import List, Dict, Literal, Optional
 
 from pydantic import BaseModel, Field
 
@@ -52,6 +52,76 @@ class RegUrls(BaseModel):
     asia: str
 
 
+class Connection(BaseModel):
+    limit: int
+    limit_per_host: int
+    ttl_dns_cache: int
+    keepalive_timeout: int
+    timeout: int
+
+
+class StatsCache(BaseModel):
+    max_bytes: int
+    ttl: int
+    stale_ttl: int
+    tank_snapshots: int
+
+
+class RateLimit(BaseModel):
+    rate: float
+    min_rate: float
+    max_rate: float
+    backoff: float
+    increase_step: float
+    probe_after: int
+
+
+class Scheduler(BaseModel):
+    starvation_limit: int
+
+
+class CircuitBreaker(BaseModel):
+    failure_threshold: int
+    recovery_timeout: float
+    half_open_probes: int
+
+
+class Hedging(BaseModel):
+    enabled: bool
+    percentile: float
+    min_delay: float
+    window: int
+    min_samples: int
+
+
+class NicknameIndex(BaseModel):
+    ttl: int
+    negative_ttl: int
+    max_entries: int
+
+
+class RatingLeaderboard(BaseModel):
+    url: str
+    rate: float
+    max_age: int
+    refresh_interval: int
+
+
+class TransportStub(BaseModel):
+    players: int
+    latency: float
+    limit_exceeded_rate: float
+    unavailable_rate: float
+
+
+class Transport(BaseModel):
+    kind: Literal['http', 'fixtures']
+    base_url: Optional[str] = None
+    record_dir: Optional[str] = None
+    fixtures_dir: str
+    stub: TransportStub
+
+
 class Urls(BaseModel):
     get_id: str
     search: str
@@ -63,6 +133,15 @@ class Urls(BaseModel):
 
 class GameApi(BaseModel):
     reg_urls: RegUrls
+    connection: Connection
+    stats_cache: StatsCache
+    rate_limit: RateLimit
+    scheduler: Scheduler
+    circuit_breaker: CircuitBreaker
+    hedging: Hedging
+    nickname_index: NicknameIndex
+    rating_leaderboard: RatingLeaderboard
+    transport: Transport
     urls: Urls
 
 
@@ -70,6 +149,38 @@ class SessionWidget(BaseModel):
     url: str
 
 
+class MemberCache(BaseModel):
+    max_entries: int
+    ttl: int
+
+
+class AnalyticsBuffer(BaseModel):
+    flush_interval: float
+    max_batch: int
+    max_pending: int
+
+
+class InternalRegistry(BaseModel):
+    poll_interval: float
+
+
+class Tankopedia(BaseModel):
+    refresh_interval: int
+    remove_missing: bool
+
+
+class Scan(BaseModel):
+    batch_size: int
+
+
+class Database(BaseModel):
+    member_cache: MemberCache
+    analytics_buffer: AnalyticsBuffer
+    internal_registry: InternalRegistry
+    tankopedia: Tankopedia
+    scan: Scan
+
+
 class ConfigStruct(BaseModel):
     server: Server
     bot_name: str
@@ -85,3 +196,4 @@ class ConfigStruct(BaseModel):
     allowed_updates: List[str]
     developers_id: List[int]
     session_widget: SessionWidget
+    database: Database
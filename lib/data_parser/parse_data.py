@@ -26,39 +26,41 @@ def get_normalized_data(data: PlayerGlobalData) -> PlayerGlobalData:
         data.data.statistics.all.damage_ratio = safe_divide(all_stats.damage_dealt, all_stats.damage_received)
         data.data.statistics.all.destruction_ratio = safe_divide(all_stats.frags, all_stats.not_survived_battles)
         
-        data.data.statistics.rating.avg_xp = safe_divide(rating_stats.xp, rating_stats.battles, return_type=DivideReturnType.INTEGER)
-        data.data.statistics.rating.avg_damage = safe_divide(rating_stats.damage_dealt, rating_stats.battles, return_type=DivideReturnType.INTEGER)
-        data.data.statistics.rating.accuracy = safe_divide(rating_stats.hits, rating_stats.shots) * 100
-        data.data.statistics.rating.winrate = safe_divide(rating_stats.wins, rating_stats.battles) * 100
-        data.data.statistics.rating.avg_spotted = safe_divide(rating_stats.spotted, rating_stats.battles)
-        data.data.statistics.rating.frags_per_battle = safe_divide(rating_stats.frags, rating_stats.battles)
-        data.data.statistics.rating.not_survived_battles = rating_stats.battles - rating_stats.survived_battles
-        data.data.statistics.rating.survival_ratio = safe_divide(rating_stats.survived_battles, rating_stats.battles)
-        data.data.statistics.rating.damage_ratio = safe_divide(rating_stats.damage_dealt, rating_stats.damage_received)
-        data.data.statistics.rating.destruction_ratio = safe_divide(rating_stats.frags, rating_stats.not_survived_battles)
+        if rating_stats is not None:
+            data.data.statistics.rating.avg_xp = safe_divide(rating_stats.xp, rating_stats.battles, return_type=DivideReturnType.INTEGER)
+            data.data.statistics.rating.avg_damage = safe_divide(rating_stats.damage_dealt, rating_stats.battles, return_type=DivideReturnType.INTEGER)
+            data.data.statistics.rating.accuracy = safe_divide(rating_stats.hits, rating_stats.shots) * 100
+            data.data.statistics.rating.winrate = safe_divide(rating_stats.wins, rating_stats.battles) * 100
+            data.data.statistics.rating.avg_spotted = safe_divide(rating_stats.spotted, rating_stats.battles)
+            data.data.statistics.rating.frags_per_battle = safe_divide(rating_stats.frags, rating_stats.battles)
+            data.data.statistics.rating.not_survived_battles = rating_stats.battles - rating_stats.survived_battles
+            data.data.statistics.rating.survival_ratio = safe_divide(rating_stats.survived_battles, rating_stats.battles)
+            data.data.statistics.rating.damage_ratio = safe_divide(rating_stats.damage_dealt, rating_stats.damage_received)
+            data.data.statistics.rating.destruction_ratio = safe_divide(rating_stats.frags, rating_stats.not_survived_battles)
 
-        if data.data.statistics.rating.calibration_battles_left == 0 and data.data.statistics.rating.battles != 0:
-            data.data.statistics.rating.rating = int(data.data.statistics.rating.mm_rating * 10 + 3000)
-        else:
-            data.data.statistics.rating.rating = 0
+            if data.data.statistics.rating.calibration_battles_left == 0 and data.data.statistics.rating.battles != 0:
+                data.data.statistics.rating.rating = int(data.data.statistics.rating.mm_rating * 10 + 3000)
+            else:
+                data.data.statistics.rating.rating = 0
             
         if data.data.clan_stats is not None:
             data.data.name_and_tag = f'{data.nickname} [{data.data.clan_stats.tag}]'
         else:
             data.data.name_and_tag = f'{data.nickname}'
 
-        if data.data.achievements.mainGun is None:
-            data.data.achievements.mainGun = 0
-        if data.data.achievements.markOfMastery is None:
-            data.data.achievements.markOfMastery = 0
-        if data.data.achievements.medalKolobanov is None:
-            data.data.achievements.medalKolobanov = 0
-        if data.data.achievements.medalRadleyWalters is None:
-            data.data.achievements.medalRadleyWalters = 0
-        if data.data.achievements.warrior is None:
-            data.data.achievements.warrior = 0
+        if data.data.achievements is not None:
+            if data.data.achievements.mainGun is None:
+                data.data.achievements.mainGun = 0
+            if data.data.achievements.markOfMastery is None:
+                data.data.achievements.markOfMastery = 0
+            if data.data.achievements.medalKolobanov is None:
+                data.data.achievements.medalKolobanov = 0
+            if data.data.achievements.medalRadleyWalters is None:
+                data.data.achievements.medalRadleyWalters = 0
+            if data.data.achievements.warrior is None:
+                data.data.achievements.warrior = 0
 
-        tanks = data.data.tank_stats
+        tanks = data.data.tank_stats or {}
 
         for key, tank in tanks.items():
             if tank.all.battles != 0:
@@ -328,6 +330,10 @@ async def _generate_tank_session_dict(data_old: PlayerGlobalData, data_new: Play
     tanks = data_new.data.tank_stats
     tanks_old = data_old.data.tank_stats
 
+    if tanks is None or tanks_old is None:
+        _log.debug('Tank stats were not fetched, skipping tanks session')
+        return None
+
     diff_battles = []
 
     for _, (key, tank) in enumerate(tanks.items()):
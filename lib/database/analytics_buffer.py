@@ -0,0 +1,156 @@
+import asyncio
+from collections import deque
+from datetime import datetime, timedelta
+from typing import Callable
+
+import pytz
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, PyMongoError
+
+from lib.data_classes.db_player import UsedCommand
+from lib.logger.logger import get_logger
+from lib.utils.calculate_exp import exp_add
+
+_log = get_logger(__file__, 'AnalyticsBufferLogger', 'logs/analytics_buffer.log')
+
+# Commands closer than that to the previous activity give 1 exp only
+ACTIVITY_GAP = timedelta(seconds=10)
+USED_COMMANDS_LIMIT = 10
+
+
+class AnalyticsBuffer:
+    """
+    Write-behind buffer of command analytics (`used_commands`, `commands_counter`, `level_exp`, `last_activity`).
+
+    Commands are collected in memory and written every `flush_interval` seconds, or as soon as
+    `max_batch` are pending, as one `bulk_write` with one pipeline `UpdateOne` per member.
+    At most `max_pending` commands are kept: the next ones are dropped and counted in `dropped`,
+    commands of a failed write are counted in `lost`.
+    """
+    def __init__(
+            self,
+            collection,
+            on_written: Callable[[int], None],
+            flush_interval: float,
+            max_batch: int,
+            max_pending: int
+        ) -> None:
+        self.collection = collection
+        self.on_written = on_written
+        self.flush_interval = flush_interval
+        self.max_batch = max_batch
+        self.max_pending = max_pending
+
+        self._pending: deque[tuple[int, UsedCommand, datetime]] = deque()
+        self._flush_needed = asyncio.Event()
+        self._flush_lock = asyncio.Lock()
+
+        self.added = 0
+        self.written = 0
+        self.dropped = 0
+        self.lost = 0
+        self.flushes = 0
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def add(self, member_id: int, used_command: UsedCommand) -> None:
+        """
+        Queues a used command, without waiting for any I/O.
+        """
+        if len(self._pending) >= self.max_pending:
+            self.dropped += 1
+            if self.dropped % 1000 == 1:
+                _log.warning(f'Analytics buffer is full ({self.max_pending}), {self.dropped} commands dropped so far')
+            return
+
+        self._pending.append((int(member_id), used_command, datetime.now(pytz.utc)))
+        self.added += 1
+        if len(self._pending) >= self.max_batch:
+            self._flush_needed.set()
+
+    @staticmethod
+    def make_update(events: list[tuple[UsedCommand, datetime]]) -> list[dict]:
+        """
+        Builds the pipeline update applying the commands of one member.
+
+        A command gives its full exp only if the previous activity is older than `ACTIVITY_GAP`, otherwise 1 exp.
+        """
+        first_command, first_at = events[0]
+        level_exp = sum(
+            exp_add(command.name) if used_at - previous_at > ACTIVITY_GAP else 1
+            for (command, used_at), (_, previous_at) in zip(events[1:], events)
+        )
+        used_commands = [command.model_dump() for command, _ in events[-USED_COMMANDS_LIMIT:]]
+
+        return [{'$set': {
+            'profile.level_exp': {'$add': [
+                '$profile.level_exp',
+                level_exp,
+                {'$cond': [{'$lt': ['$profile.last_activity', first_at - ACTIVITY_GAP]}, exp_add(first_command.name), 1]}
+            ]},
+            'profile.commands_counter': {'$add': ['$profile.commands_counter', len(events)]},
+            'profile.used_commands': {'$slice': [
+                {'$concatArrays': [{'$ifNull': ['$profile.used_commands', []]}, {'$literal': used_commands}]},
+                -USED_COMMANDS_LIMIT
+            ]},
+            'profile.last_activity': {'$max': ['$profile.last_activity', events[-1][1]]},
+        }}]
+
+    async def flush(self) -> None:
+        """
+        Writes every pending command.
+        """
+        async with self._flush_lock:
+            self._flush_needed.clear()
+            if not self._pending:
+                return
+
+            events = list(self._pending)
+            self._pending.clear()
+
+            by_member: dict[int, list[tuple[UsedCommand, datetime]]] = {}
+            for member_id, used_command, used_at in events:
+                by_member.setdefault(member_id, []).append((used_command, used_at))
+
+            member_ids = list(by_member)
+            operations = [UpdateOne({'id': member_id}, self.make_update(by_member[member_id])) for member_id in member_ids]
+            try:
+                await self.collection.bulk_write(operations, ordered=False)
+            except BulkWriteError as error:
+                failed = {member_ids[write_error['index']] for write_error in error.details['writeErrors']}
+                lost = sum(len(by_member[member_id]) for member_id in failed)
+                self.lost += lost
+                self.written += len(events) - lost
+                _log.error(f'Analytics bulk write failed for {len(failed)} members: {error.details["writeErrors"][:3]}')
+            except PyMongoError:
+                self.lost += len(events)
+                _log.exception(f'Analytics bulk write of {len(events)} commands failed')
+            else:
+                self.written += len(events)
+            finally:
+                self.flushes += 1
+                for member_id in by_member:
+                    self.on_written(member_id)
+
+    async def run(self, stop: Callable[[], bool]) -> None:
+        """
+        Flushes the buffer every `flush_interval` seconds, or earlier when `max_batch` commands are pending,
+        until `stop()` is True.
+        """
+        while not stop():
+            try:
+                await asyncio.wait_for(self._flush_needed.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            await self.flush()
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'pending': len(self._pending),
+            'added': self.added,
+            'written': self.written,
+            'dropped': self.dropped,
+            'lost': self.lost,
+            'flushes': self.flushes,
+        }
@@ -0,0 +1,77 @@
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import ASCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'DBIndexesLogger', 'logs/db_indexes.log')
+
+
+class IndexSpec:
+    """
+    One index of the index registry, see `INDEXES`.
+    """
+    __slots__ = ('database', 'collection', 'keys', 'options')
+
+    def __init__(self, database: str, collection: str, keys: list[tuple[str, int]], **options) -> None:
+        self.database = database
+        self.collection = collection
+        self.keys = keys
+        self.options = options
+
+    @property
+    def name(self) -> str:
+        return self.options.get('name') or '_'.join(f'{key}_{direction}' for key, direction in self.keys)
+
+    def to_model(self) -> IndexModel:
+        return IndexModel(self.keys, **{'name': self.name, **self.options})
+
+
+INDEXES: list[IndexSpec] = [
+    IndexSpec('TgPlayersDB', 'players', [('id', ASCENDING)], unique=True),
+    IndexSpec(
+        'TgPlayersDB',
+        'players',
+        [('hook_stats.active', ASCENDING)],
+        name='hook_stats_active',
+        partialFilterExpression={'hook_stats.active': True}
+    ),
+    IndexSpec('TgPlayersDB', 'players', [('profile.last_activity', ASCENDING)]),
+    IndexSpec('TankopediaDB', 'tanks_ru', [('id', ASCENDING)], unique=True),
+    IndexSpec('TankopediaDB', 'tanks_eu', [('id', ASCENDING)], unique=True),
+    IndexSpec('TgInternalDB', 'internal', [('name', ASCENDING)], unique=True),
+]
+
+
+async def apply_indexes(client: AsyncIOMotorClient, indexes: list[IndexSpec] = INDEXES) -> list[str]:
+    """
+    Creates the missing indexes of the registry. Existing indexes are left as they are, so it is safe on every startup.
+
+    An index conflicting with an existing one (same name or keys with other options, duplicate keys
+    for a unique index) is logged and skipped.
+
+    Args:
+        client (AsyncIOMotorClient): The MongoDB client.
+        indexes (list[IndexSpec], optional): The indexes to apply. Defaults to `INDEXES`.
+
+    Returns:
+        list[str]: The `<database>.<collection>.<index>` names of the created indexes.
+    """
+    created = []
+
+    for spec in indexes:
+        collection = client[spec.database][spec.collection]
+        existing = await collection.index_information()
+        if spec.name in existing:
+            continue
+
+        try:
+            await collection.create_indexes([spec.to_model()])
+        except OperationFailure as error:
+            _log.error(f'Index {spec.database}.{spec.collection}.{spec.name} not created: {error}')
+            continue
+
+        created.append(f'{spec.database}.{spec.collection}.{spec.name}')
+        _log.info(f'Index {spec.database}.{spec.collection}.{spec.name} created')
+
+    return created
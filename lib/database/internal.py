@@ -1,56 +1,111 @@
+import asyncio
+from typing import Callable
+
 import pytz
 import motor.motor_asyncio
 from bson.codec_options import CodecOptions
+from pymongo.errors import OperationFailure, PyMongoError
 
 from lib.logger.logger import get_logger
+from lib.settings.settings import Config
 from lib.utils.singleton_factory import singleton
 
 _log = get_logger(__file__, 'InternalDBLogger', 'logs/internal_db.log')
+_config = Config().get()
 
 
 @singleton
 class InternalDB():
+    """
+    Banned and premium users, kept in memory as frozensets.
+
+    The sets are loaded on first use, updated right away by the setters of this class and
+    refreshed by `watch` from a change stream, or by polling if change streams aren't
+    available (standalone server).
+    """
     def __init__(self) -> None:
         self.client = motor.motor_asyncio.AsyncIOMotorClient("mongodb://localhost:27017")
         self.db = self.client.get_database('TgInternalDB')
         self.collection = self.db.get_collection('internal', codec_options=CodecOptions(tz_aware=True, tzinfo=pytz.utc))
+
+        self.banned_users: frozenset[int] = frozenset()
+        self.premium_users: frozenset[int] = frozenset()
+        self.loaded = False
+
+    def _load(self, data: dict | None) -> None:
+        data = data or {}
+        self.banned_users = frozenset(data.get('banned_users') or ())
+        self.premium_users = frozenset(data.get('premium_users') or ())
+        self.loaded = True
+
+    async def refresh(self) -> None:
+        self._load(await self.collection.find_one({'name': 'internal_info'}, {'banned_users': 1, 'premium_users': 1}))
+
+    async def _ensure_loaded(self) -> None:
+        if not self.loaded:
+            await self.refresh()
+
+    async def watch(self, stop: Callable[[], bool]) -> None:
+        """
+        Keeps the sets in sync with the database until `stop()` is True.
+
+        Listens to a change stream of the `internal_info` document, falls back to a refresh every
+        `database.internal_registry.poll_interval` seconds if the server doesn't support change streams.
+        """
+        poll_interval = _config.database.internal_registry.poll_interval
+
+        while not stop():
+            try:
+                async with self.collection.watch(
+                    [{'$match': {'fullDocument.name': 'internal_info'}}],
+                    full_document='updateLookup',
+                    max_await_time_ms=int(poll_interval * 1000)
+                ) as stream:
+                    await self.refresh()
+                    _log.info('Watching internal_info with a change stream')
+                    while not stop() and stream.alive:
+                        change = await stream.try_next()
+                        if change is not None:
+                            self._load(change.get('fullDocument'))
+            except OperationFailure as error:
+                _log.info(f'Change streams are not available ({error.code}), polling internal_info every {poll_interval}s')
+                while not stop():
+                    try:
+                        await self.refresh()
+                    except PyMongoError:
+                        _log.exception('internal_info refresh failed')
+                    await asyncio.sleep(poll_interval)
+            except PyMongoError:
+                _log.exception('internal_info change stream failed, reopening')
+                await asyncio.sleep(poll_interval)
         
     async def set_actual_premium_users(self, users: list[int]) -> None:
-        if await self.collection.find_one({'name': 'internal_info'}) is None:
-            await self.collection.insert_one(
-                {'name': 'internal_info', 'premium_users': users},
-            )
-        else:
-            await self.collection.update_one(
-                {'name': 'internal_info'},
-                {'$set': {'premium_users': users}},
-            )
+        await self.collection.update_one(
+            {'name': 'internal_info'},
+            {'$set': {'premium_users': users}},
+            upsert=True
+        )
+        self.premium_users = frozenset(users)
             
     async def set_ban(self, user_id: int) -> None:
-        if await self.collection.find_one({'name': 'internal_info'}) is None:
-            await self.collection.insert_one(
-                {'name': 'internal_info', 'banned_users': [user_id]},
-            )
-        else:
-            await self.collection.update_one(
-                {'name': 'internal_info'},
-                {'$push': {'banned_users': user_id}},
-            )
+        await self.collection.update_one(
+            {'name': 'internal_info'},
+            {'$addToSet': {'banned_users': user_id}},
+            upsert=True
+        )
+        self.banned_users = self.banned_users | {user_id}
     
     async def remove_ban(self, user_id: int) -> None:
         await self.collection.update_one(
             {'name': 'internal_info'},
             {'$pull': {'banned_users': user_id}},
         )
+        self.banned_users = self.banned_users - {user_id}
         
     async def check_ban(self, user_id: int) -> bool:
-        data = await self.collection.find_one({'name': 'internal_info'})
-        
-        try:
-            return user_id in data['banned_users']
-        except (KeyError, TypeError):
-            return False
+        await self._ensure_loaded()
+        return user_id in self.banned_users
         
-    async def get_actual_premium_users(self) -> list[int]:
-        data = await self.collection.find_one({'name': 'internal_info'})
-        return data['premium_users'] if data is not None else []
\ No newline at end of file
+    async def get_actual_premium_users(self) -> frozenset[int]:
+        await self._ensure_loaded()
+        return self.premium_users
@@ -0,0 +1,76 @@
+from collections import OrderedDict
+from time import monotonic
+
+from lib.data_classes.db_player import DBPlayer
+
+
+class MemberCache:
+    """
+    LRU cache of validated `DBPlayer` documents keyed by member id, in front of the `players` collection.
+
+    Entries live for `ttl` seconds. Every write of `PlayersDB` invalidates the member, and bumps
+    its version, so a read that started before the write can't put the old document back.
+
+    Cached members are shared between callers: change them through the `PlayersDB` setters only.
+    """
+    def __init__(self, max_entries: int, ttl: int) -> None:
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._entries: OrderedDict[int, tuple[DBPlayer, float]] = OrderedDict()
+        self._versions: dict[int, int] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, member_id: int) -> bool:
+        entry = self._entries.get(member_id)
+        return entry is not None and monotonic() - entry[1] < self.ttl
+
+    def get(self, member_id: int) -> DBPlayer | None:
+        entry = self._entries.get(member_id)
+        if entry is None or monotonic() - entry[1] >= self.ttl:
+            self._entries.pop(member_id, None)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(member_id)
+        self.hits += 1
+        return entry[0]
+
+    def get_version(self, member_id: int) -> int:
+        return self._versions.get(member_id, 0)
+
+    def set(self, member_id: int, member: DBPlayer, version: int) -> None:
+        """
+        Stores a member read from the database.
+
+        Args:
+            member_id (int): The member id.
+            member (DBPlayer): The validated member document.
+            version (int): `get_version` taken before the read, the member isn't stored if it was written since.
+        """
+        if self.get_version(member_id) != version:
+            return
+
+        self._entries[member_id] = (member, monotonic())
+        self._entries.move_to_end(member_id)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, member_id: int) -> None:
+        self._entries.pop(member_id, None)
+        self._versions[member_id] = self.get_version(member_id) + 1
+        self.invalidations += 1
+
+    def get_counters(self) -> dict[str, int]:
+        return {
+            'members': len(self._entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'invalidations': self.invalidations,
+        }
@@ -1,17 +1,22 @@
 import asyncio
 from datetime import datetime, timedelta
 from types import NoneType
-from typing import Any
+from typing import Any, AsyncIterator, Callable, TypeVar
 
 import pytz
 import motor.motor_asyncio
 from bson.codec_options import CodecOptions
+from pymongo import ASCENDING
+from pymongo.results import UpdateResult
 
 from lib.data_classes.api.api_data import PlayerGlobalData
+from lib.database.analytics_buffer import AnalyticsBuffer
+from lib.database.indexes import INDEXES, apply_indexes
+from lib.database.member_cache import MemberCache
+from lib.database.snapshots import SnapshotsDB
 from lib.exceptions import database
 from lib.logger.logger import get_logger
 from lib.settings.settings import Config
-from lib.utils.calculate_exp import exp_add
 from lib.utils.singleton_factory import singleton
 from lib.utils.validate_badges import validate_badge
 
@@ -28,12 +33,16 @@ from lib.data_classes.db_player import (
     SessionStatesEnum,
     AccountSlotsEnum,
     UsedCommand,
-    SlotAccessState
+    SlotAccessState,
+    MemberHeader,
+    MEMBER_HEADER_PROJECTION
 )
 
 _config = Config().get()
 _log = get_logger(__file__, 'PlayersDBLogger', 'logs/players_db.log')
 
+T = TypeVar('T')
+
 
 @singleton
 class PlayersDB:
@@ -42,6 +51,106 @@ class PlayersDB:
         self.client.get_io_loop = asyncio.get_running_loop
         self.db = self.client['TgPlayersDB']
         self.collection = self.db.get_collection('players', codec_options=CodecOptions(tz_aware=True, tzinfo=pytz.utc))
+        self.members = MemberCache(_config.database.member_cache.max_entries, _config.database.member_cache.ttl)
+        self.snapshots = SnapshotsDB()
+        self.analytics = AnalyticsBuffer(
+            self.collection,
+            self.members.invalidate,
+            _config.database.analytics_buffer.flush_interval,
+            _config.database.analytics_buffer.max_batch,
+            _config.database.analytics_buffer.max_pending
+        )
+    
+    async def _find_member(self, member_id: int) -> DBPlayer | None:
+        """
+        Returns the validated member document, from the member cache if possible.
+        """
+        member = self.members.get(member_id)
+        if member is not None:
+            return member
+
+        version = self.members.get_version(member_id)
+        result = await self.collection.find_one({'id': member_id})
+        if result is None:
+            return None
+
+        member = DBPlayer.model_validate(result)
+        self.members.set(member_id, member, version)
+        return member
+
+    async def _update_member(self, member_id: int | str, update: dict | list[dict], query: dict | None = None) -> UpdateResult:
+        """
+        Applies an update to one member document and invalidates its cached copy.
+
+        Every write of a member document has to go through this method, so the member cache stays coherent.
+
+        Args:
+            member_id (int | str): The ID of the member.
+            update (dict | list[dict]): The update document, or an aggregation pipeline.
+            query (dict | None, optional): More conditions the document has to match.
+
+        Returns:
+            UpdateResult: The result of `update_one`.
+        """
+        member_id = int(member_id)
+        try:
+            return await self.collection.update_one({'id': member_id, **(query or {})}, update)
+        finally:
+            self.members.invalidate(member_id)
+
+    async def _replace_last_stats(
+            self,
+            member: DBPlayer,
+            slot: AccountSlotsEnum,
+            last_stats: PlayerGlobalData | None,
+            update: dict | None = None
+        ) -> None:
+        """
+        Points the slot to a snapshot of `last_stats` (or to none) and releases the previous snapshot.
+
+        Args:
+            member (DBPlayer): The member object.
+            slot (AccountSlotsEnum): The slot of the game account.
+            last_stats (PlayerGlobalData | None): The new session stats, None to stop the session.
+            update (dict | None, optional): More fields to `$set` in the same write.
+        """
+        game_account: GameAccount | None = getattr(member.game_accounts, slot.name)
+        previous = game_account.last_stats_ref if game_account is not None else None
+        ref = await self.snapshots.add(last_stats) if last_stats is not None else None
+
+        await self._update_member(
+            member.id,
+            {'$set': {
+                f'game_accounts.{slot.name}.last_stats_ref': ref.model_dump() if ref is not None else None,
+                f'game_accounts.{slot.name}.last_stats': None,
+                **(update or {})
+            }}
+        )
+        if previous is not None:
+            await self.snapshots.release(previous.id)
+
+    async def move_last_stats_to_snapshots(self) -> int:
+        """
+        Moves the `last_stats` embedded in member documents to `SnapshotsDB`.
+
+        Returns:
+            int: The count of moved snapshots.
+
+        Note:
+            Use one time only.
+        """
+        moved = 0
+        query = {'$or': [{f'game_accounts.{slot.name}.last_stats': {'$ne': None}} for slot in AccountSlotsEnum]}
+        async for document in self.collection.find(query):
+            member = DBPlayer.model_validate(document)
+            for slot in AccountSlotsEnum:
+                game_account: GameAccount | None = getattr(member.game_accounts, slot.name)
+                if game_account is not None and game_account.last_stats is not None:
+                    await self._replace_last_stats(member, slot, game_account.last_stats)
+                    moved += 1
+
+        _log.info(f'Moved {moved} last stats to snapshots')
+        return moved
     
     async def _multi_args_member_checker(self, member_id: int | str | None = None, member: DBPlayer | None = None, raise_error: bool = True) -> DBPlayer:
         """
@@ -69,23 +178,55 @@ class PlayersDB:
                 return member
         else:
             return member
-        
-    async def create_index_for_id(self):
+
+    async def _multi_args_header_checker(self, member_id: int | str | None = None, member: DBPlayer | None = None, raise_error: bool = True) -> MemberHeader | None:
+        """
+        Same as `_multi_args_member_checker`, but reads only the `MemberHeader` fields when no member object is given.
         """
-        Asynchronously creates an index on the 'id' field of the collection.
+        if (member_id is None) and (member is None):
+            raise ValueError('You must provide either id or member')
 
-        This function creates a unique index on the 'id' field of the collection. The index is used to improve the performance of queries that involve the 'id' field.
+        if member is not None:
+            return MemberHeader.from_member(member)
+        return await self.get_member_header(member_id, raise_error=raise_error)
 
-        Parameters:
-            self (PlayersDB): The instance of the PlayersDB class.
+    async def get_member_header(self, member_id: int | str, raise_error: bool = True) -> MemberHeader | None:
+        """
+        Asynchronously retrieves the scalar fields of a member, without the game accounts and the image.
+
+        Args:
+            member_id (int | str): The ID of the member.
+            raise_error (bool, optional): If True, raises a MemberNotFound exception if the member does not exist. Defaults to True.
 
         Returns:
-            None
-            
+            MemberHeader | None: The member header, None if the member does not exist.
+        """
+        member_id = int(member_id)
+        member = self.members.get(member_id)
+        if member is not None:
+            return MemberHeader.from_member(member)
+
+        result = await self.collection.find_one({'id': member_id}, MEMBER_HEADER_PROJECTION)
+        if result is None:
+            if raise_error:
+                _log.info(f'Player with id {member_id} not found')
+                raise database.MemberNotFound()
+            return None
+
+        return MemberHeader.from_document(result)
+        
+    async def create_index_for_id(self):
+        """
+        Asynchronously creates the indexes of the players collection.
+
         Note:
-            Use one time only.
+            Kept for compatibility, the indexes of every collection are applied at startup by
+            `lib.database.indexes.apply_indexes`.
         """
-        await self.collection.create_index({'id': 1}, unique=True)
+        await apply_indexes(
+            self.client,
+            [spec for spec in INDEXES if (spec.database, spec.collection) == (self.db.name, self.collection.name)]
+        )
         
     async def get_all_members_count(self) -> int:
         """
@@ -100,16 +241,70 @@ class PlayersDB:
         """
         return await self.collection.count_documents({})
     
+    async def iter_members(
+            self,
+            query: dict | None = None,
+            projection: dict | None = None,
+            batch_size: int | None = None,
+            parse: Callable[[dict], T] = DBPlayer.model_validate
+        ) -> AsyncIterator[list[T]]:
+        """
+        Streams the members matching `query` in batches, one `_id` range query per batch.
+
+        Only one batch is kept in memory, and no cursor stays open while a batch is processed,
+        so slow consumers can't hit the idle cursor timeout. The members are not put in the member cache.
+
+        Args:
+            query (dict | None, optional): The filter of the members. Defaults to all members.
+            projection (dict | None, optional): The projection of the documents. Fields projected out
+                get their defaults in `DBPlayer`, required ones have to be kept.
+            batch_size (int | None, optional): The size of the batches. Defaults to `database.scan.batch_size`.
+            parse (Callable[[dict], T], optional): Builds the yielded object from a document. Defaults to `DBPlayer.model_validate`.
+
+        Usage Example:
+            >>> async for members in PlayersDB().iter_members(projection=MEMBER_HEADER_PROJECTION, parse=MemberHeader.from_document):
+            ...     ...
+
+        Yields:
+            list[T]: The next batch of members.
+        """
+        batch_size = batch_size or _config.database.scan.batch_size
+        query = query or {}
+        # `_id` is the position of the scan, it is fetched even if projected out
+        hide_id = projection is not None and projection.get('_id') == 0
+        if hide_id:
+            projection = {key: value for key, value in projection.items() if key != '_id'} or None
+        last_id = None
+
+        while True:
+            page_query = query if last_id is None else {'$and': [query, {'_id': {'$gt': last_id}}]}
+            cursor = self.collection.find(page_query, projection).sort('_id', ASCENDING).limit(batch_size)
+            documents = await cursor.to_list(None)
+            if not documents:
+                return
+
+            last_id = documents[-1]['_id']
+            if hide_id:
+                for document in documents:
+                    del document['_id']
+            yield [parse(document) for document in documents]
+
+            if len(documents) < batch_size:
+                return
+
     async def count_sessions(self) -> int:
         sessions = 0
-        cursor = self.collection.find({})
+        projection = {'_id': 0, 'id': 1, 'profile': 1, 'current_game_account': 1}
+        for slot in AccountSlotsEnum:
+            for field in ('nickname', 'game_id', 'region', 'session_settings', 'last_stats_ref', 'last_stats'):
+                projection[f'game_accounts.{slot.name}.{field}'] = 1
 
-        while cursor.alive:
-            member = DBPlayer.model_validate(await cursor.next())
-            all_slots = await self.get_all_used_slots(member=member)
-            for slot in all_slots:
-                if await self.check_member_last_stats(member=member, slot=slot):
-                    sessions += 1
+        async for members in self.iter_members(projection=projection):
+            for member in members:
+                all_slots = await self.get_all_used_slots(member=member)
+                for slot in all_slots:
+                    if await self.check_member_last_stats(member=member, slot=slot):
+                        sessions += 1
         
         return sessions
 
@@ -126,6 +321,28 @@ class PlayersDB:
         """
         return await self.collection.distinct('id')
     
+    async def get_all_game_accounts(self) -> list[GameAccount]:
+        """
+        Asynchronously retrieves the nickname, game ID and region of every game account of every member.
+
+        Only these fields are read from the collection, the other `GameAccount` fields have their defaults.
+
+        Returns:
+            list[GameAccount]: The game accounts of all members.
+        """
+        projection = {'_id': 0}
+        for slot in AccountSlotsEnum:
+            for field in ('nickname', 'game_id', 'region'):
+                projection[f'game_accounts.{slot.name}.{field}'] = 1
+
+        game_accounts = []
+        async for member in self.collection.find({}, projection):
+            for game_account in member.get('game_accounts', {}).values():
+                if game_account:
+                    game_accounts.append(GameAccount.model_validate(game_account))
+
+        return game_accounts
+
     async def set_member(self, slot: AccountSlotsEnum, member_id: int | str, game_account: GameAccount, slot_override: bool = False) -> None:
         """
         Sets a member's game account in the specified slot or creates a new member if it doesn't exist.
@@ -152,11 +369,15 @@ class PlayersDB:
             await self.check_access_to_slot(slot, member=member)
             slot_is_empty = await self.check_slot_empty(slot, member=member, raise_error=False)
             if slot_is_empty or slot_override:
-                await self.collection.update_one(
-                    {'id': member_id},
+                previous: GameAccount | None = getattr(member.game_accounts, slot.name)
+                await self._update_member(
+                    member_id,
                     {'$set': {f'game_accounts.{slot.name}': game_account.model_dump()}}
                 )
+                if previous is not None and previous.last_stats_ref is not None:
+                    await self.snapshots.release(previous.last_stats_ref.id)
         else:
+            self.members.invalidate(member_id)
             await self.collection.insert_one({
                 'id': member_id,
                 'lang' : None,
@@ -275,7 +496,14 @@ class PlayersDB:
         Returns:
             None: This function does not return anything.
         """
-        await self.collection.delete_one({'id': member_id})
+        member = await self.get_member(member_id, raise_error=False)
+        await self.collection.delete_one({'id': int(member_id)})
+        self.members.invalidate(int(member_id))
+
+        if member:
+            for game_account in member.game_accounts.as_list():
+                if game_account.last_stats_ref is not None:
+                    await self.snapshots.release(game_account.last_stats_ref.id)
         
     async def check_member_exists(self, member_id: int | str, get_if_exist: bool = False, raise_error: bool = True) -> bool | DBPlayer:
         """
@@ -294,7 +522,12 @@ class PlayersDB:
             MemberNotFound: If raise_error is True and the player does not exist.
         """
         member_id = int(member_id)
-        result = await self.collection.find_one({'id': member_id})
+        if get_if_exist:
+            result = await self._find_member(member_id)
+        elif member_id in self.members:
+            result = True
+        else:
+            result = await self.collection.find_one({'id': member_id}, {'_id': 1})
         
         if raise_error and (result is None):
             _log.info(f'Player with id {member_id} not found')
@@ -302,8 +535,7 @@ class PlayersDB:
         
         if get_if_exist:
             if result is not None:
-                player = DBPlayer.model_validate(result)
-                return player
+                return result
             else:
                 return False
         else:
@@ -381,15 +613,22 @@ class PlayersDB:
 
         This function updates the 'profile.premium' and 'profile.premium_time' fields of the member with the given ID in the database. It sets 'profile.premium' to False and 'profile.premium_time' to None, effectively unsetting the premium status of the member.
         """
-        member = await self.check_member_exists(member_id, get_if_exist=True)
-        curr_slot = await self.get_current_game_slot(member=member)
-        if curr_slot.value > 2:
-            await self.set_current_account(member_id=member.id, slot=AccountSlotsEnum.slot_1, validate=False)
-        
-        await self.collection.update_one(
-            {'id': member.id}, 
-            {'$set': {'profile.premium': False, 'profile.premium_time': None}}
+        premium_slots = [slot.name for slot in AccountSlotsEnum if slot.value > 2]
+        result = await self._update_member(
+            member_id,
+            [{'$set': {
+                'profile.premium': False,
+                'profile.premium_time': None,
+                'current_game_account': {'$cond': [
+                    {'$in': ['$current_game_account', premium_slots]},
+                    AccountSlotsEnum.slot_1.name,
+                    '$current_game_account'
+                ]}
+            }}]
         )
+        if result.matched_count == 0:
+            _log.info(f'Player with id {member_id} not found')
+            raise database.MemberNotFound()
         
     async def set_premium(self, member_id: int | str, end_time: datetime | None) -> None:
         """
@@ -406,12 +645,13 @@ class PlayersDB:
             None
 
         This function updates the 'profile.premium' and 'profile.premium_time' fields of the member with the given ID in the database. If 'end_time' is None, the member will be set as premium indefinitely. Otherwise, the member will be set as premium until the specified 'end_time'.
+        A later 'premium_time' already stored is kept, so concurrent renewals can't shorten the premium.
         """
         _log.info(f'Setting premium for id {member_id}, end_time: {end_time}')
         end_time = datetime.now(pytz.utc) + timedelta(days=14) if end_time is None else end_time
-        await self.collection.update_one(
-            {'id': int(member_id)},
-            {'$set': {'profile.premium': True, 'profile.premium_time': end_time}}
+        await self._update_member(
+            int(member_id),
+            {'$set': {'profile.premium': True}, '$max': {'profile.premium_time': end_time}}
         )
         
     async def check_premium(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> bool:
@@ -467,20 +707,17 @@ class PlayersDB:
             return game_account
 
     async def get_current_game_slot(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> AccountSlotsEnum:
-        member = await self._multi_args_member_checker(member_id, member)
-        return AccountSlotsEnum[member.current_game_account]
+        header = await self._multi_args_header_checker(member_id, member)
+        return header.current_slot
         
     async def start_session(self, slot: AccountSlotsEnum, member_id: int | str, last_stats: PlayerGlobalData, session_settings: SessionSettings) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': member_id},
-            {'$set': 
-                {
-                    f'game_accounts.{slot.name}.last_stats': last_stats.model_dump(),
-                    f'game_accounts.{slot.name}.session_settings': session_settings.model_dump(),
-                }
-            },
+        await self._replace_last_stats(
+            member,
+            slot,
+            last_stats,
+            {f'game_accounts.{slot.name}.session_settings': session_settings.model_dump()}
         )
     
     async def find_account_by_params(
@@ -506,47 +743,49 @@ class PlayersDB:
     async def get_session_settings(self, slot: AccountSlotsEnum, member_id: int | str, member: DBPlayer) -> SessionSettings:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
-        return getattr(member.game_accounts, slot.name).session_settings
+        return getattr(member.game_accounts, slot.name).session_settings.model_copy(deep=True)
     
     async def get_image_settings(self, slot: AccountSlotsEnum, member_id: int | str | None = None, member: DBPlayer | None = None) -> ImageSettings:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
-        return getattr(member.game_accounts, slot.name).image_settings
+        return getattr(member.game_accounts, slot.name).image_settings.model_copy(deep=True)
     
     async def get_last_stats(self, slot: AccountSlotsEnum, member_id: int | str | None = None, member: DBPlayer | None = None) -> PlayerGlobalData:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
-        last_stats = getattr(member.game_accounts, slot.name).last_stats
+        game_account: GameAccount = getattr(member.game_accounts, slot.name)
+        if game_account.last_stats_ref is not None:
+            last_stats = await self.snapshots.get(game_account.last_stats_ref.id)
+        else:
+            last_stats = game_account.last_stats
+
         if last_stats is None:
             _log.warn(f'Member {member.id} has no last stats in slot {slot.name}')
             raise database.LastStatsNotFound(f'Member {member.id} has no last stats in slot {slot.name}')
         else:
-            return PlayerGlobalData.model_validate(last_stats)
+            return last_stats
         
     async def get_stats_view_settings(self, slot: AccountSlotsEnum, member_id: int | str | None = None, member: DBPlayer | None = None) -> StatsViewSettings:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
-        return getattr(member.game_accounts, slot.name).stats_view_settings
+        return getattr(member.game_accounts, slot.name).stats_view_settings.model_copy(deep=True)
 
     async def get_widget_settings(self, slot: AccountSlotsEnum, member_id: int | str | None = None, member: DBPlayer | None = None) -> WidgetSettings:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
-        return getattr(member.game_accounts, slot.name).widget_settings
+        return getattr(member.game_accounts, slot.name).widget_settings.model_copy(deep=True)
     
     async def stop_session(self, slot: AccountSlotsEnum, member_id: int | str) -> None:
-        slot = await self.validate_slot(member_id=member_id, slot=slot)
-        await self.collection.update_one(
-            {'id': member_id},
-            {'$set': {f'game_accounts.{slot.name}.last_stats': None}}
-        )
+        member = await self.check_member_exists(member_id, get_if_exist=True)
+        slot = await self.validate_slot(member=member, slot=slot)
+        await self._replace_last_stats(member, slot, None)
     
     async def check_member_last_stats(self, slot: AccountSlotsEnum, member_id: int | str | None = None, member: DBPlayer | None = None, premium_bypass: bool = False) -> bool:
         member = await self._multi_args_member_checker(member_id, member)
         slot = await self.validate_slot(member=member, slot=slot)
         game_account: GameAccount = getattr(member.game_accounts, slot.name)
-        last_stats = game_account.last_stats
         session_settings = game_account.session_settings
-        if last_stats is None:
+        if not game_account.has_last_stats:
             return False
         else:
             if session_settings.last_get + timedelta(seconds=_config.session.ttl) < datetime.now(pytz.utc):
@@ -586,16 +825,13 @@ class PlayersDB:
         ) -> None:
         member = await self._multi_args_member_checker(member_id, None)
         curr_slot = await self.get_current_game_slot(member_id, member) if slot is None else slot
-        restart_time = session_settings.time_to_restart + timedelta(days=1)
-        session_settings.time_to_restart = restart_time
-        await self.collection.update_one(
-            {'id': member_id},
-            {'$set': 
-                {
-                    f'game_accounts.{curr_slot.name}.last_stats': last_stats.model_dump(), 
-                    f'game_accounts.{curr_slot.name}.session_settings': session_settings.model_dump(),
-                }
-            }
+        session_settings = session_settings.model_copy()
+        session_settings.time_to_restart = session_settings.time_to_restart + timedelta(days=1)
+        await self._replace_last_stats(
+            member,
+            curr_slot,
+            last_stats,
+            {f'game_accounts.{curr_slot.name}.session_settings': session_settings.model_dump()}
         )
         
     async def get_all_used_slots(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> list[AccountSlotsEnum]:
@@ -613,8 +849,8 @@ class PlayersDB:
         return slots
     
     async def get_lang(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> str | None:
-        member = await self._multi_args_member_checker(member_id, member, raise_error=False)
-        return DBPlayer.model_validate(member).lang if member is not None else None
+        header = await self._multi_args_header_checker(member_id, member, raise_error=False)
+        return header.lang if header is not None else None
     
     async def set_lang(self, member_id: int | str, lang: str | None) -> None:
         """
@@ -629,8 +865,8 @@ class PlayersDB:
 
         This function updates the 'lang' field of the member with the given ID in the database. If the language is None, it sets the language field to None.
         """
-        await self.collection.update_one(
-            {'id': int(member_id)},
+        await self._update_member(
+            int(member_id),
             {'$set': {'lang': lang}}
         )
     
@@ -642,8 +878,8 @@ class PlayersDB:
     async def set_member_lock(self, slot: AccountSlotsEnum, member_id: int | str, lock: bool) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(slot=slot, member=member)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {f'game_accounts.{slot.name}.lock': lock}}
         )
     
@@ -668,36 +904,42 @@ class PlayersDB:
                 image = None
         
         member = await self.check_member_exists(member_id, get_if_exist=True)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {'image': image}}
         )
         
     async def set_stats_view_settings(self, slot: AccountSlotsEnum | None, member_id: int | str, settings: StatsViewSettings) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {f'game_accounts.{slot.name}.stats_view_settings': settings.model_dump()}}
         )
         
     async def set_image_settings(self, slot: AccountSlotsEnum | None, member_id: int | str, settings: ImageSettings) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {f'game_accounts.{slot.name}.image_settings': settings.model_dump()}}
         )
         
     async def get_member_image(self, member_id: int | str | None, member: DBPlayer | None) -> str | None:
+        if member is None and member_id is not None and int(member_id) not in self.members:
+            result = await self.collection.find_one({'id': int(member_id)}, {'_id': 0, 'image': 1})
+            if result is None:
+                raise database.MemberNotFound()
+            return result.get('image')
+
         member = await self._multi_args_member_checker(member_id, member)
         return member.image
     
     async def set_session_settings(self, slot: AccountSlotsEnum, member_id: int | str, settings: SessionSettings) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {f'game_accounts.{slot.name}.session_settings': settings.model_dump()}}
         )
         
@@ -710,46 +952,46 @@ class PlayersDB:
     async def set_widget_settings(self, slot: AccountSlotsEnum, member_id: int | str, settings: WidgetSettings) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {f'game_accounts.{slot.name}.widget_settings': settings.model_dump()}}
         )
         
     async def set_current_account(self, member_id: int | str, slot: AccountSlotsEnum, validate: bool = True) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot) if validate else slot
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$set': {'current_game_account': slot.name}}
         )
         
     async def set_verification(self, member_id: int | str, slot: AccountSlotsEnum, verified: bool) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
         slot = await self.validate_slot(member=member, slot=slot)
-        await self.collection.update_one(
-            {'id': int(member_id)},
+        await self._update_member(
+            int(member_id),
             {'$set': {f'game_accounts.{slot.name}.verified': verified}}
         )
         
     async def get_member_exp(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> int:
-        member = await self._multi_args_member_checker(member_id, member)
-        return member.profile.level_exp
+        header = await self._multi_args_header_checker(member_id, member)
+        return header.level_exp
     
     async def set_member_exp(self, member_id: int | str, exp: int) -> None:
-        await self.collection.update_one(
-            {'id': int(member_id)},
+        await self._update_member(
+            int(member_id),
             {'$set': {'profile.level_exp': exp}}
         )
         
     async def set_last_activity(self, member_id: int | str, time: datetime = datetime.now(pytz.utc)) -> None:
-        await self.collection.update_one(
-            {'id': member_id},
+        await self._update_member(
+            member_id,
             {'$set': {'profile.last_activity': time}}
         )
     
     async def get_last_activity(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> datetime:
-        member = await self._multi_args_member_checker(member_id, member)
-        return member.profile.last_activity
+        header = await self._multi_args_header_checker(member_id, member)
+        return header.last_activity
         
     async def get_analytics(self, member_id: int | str | None = None, member: DBPlayer | None = None, raw: bool = False) -> list[UsedCommand] | list[dict]:
         member = await self._multi_args_member_checker(member_id, member)
@@ -761,67 +1003,35 @@ class PlayersDB:
     
         return member.profile.used_commands
         
-    async def set_analytics(self, analytics: UsedCommand, member: DBPlayer | None = None, member_id: int | str | None = None) -> None:
-        member = await self._multi_args_member_checker(member_id, member)
-        used_commands: list[dict] = await self.get_analytics(member=member, raw=True)
-        if (datetime.now(pytz.utc) - member.profile.last_activity) > timedelta(seconds=10):
-            level_exp = exp_add(analytics.name)
-        else:
-            level_exp = 1
-        
-        if len(used_commands) >= 10:
-            used_commands.pop(0)
-            
-        used_commands.append(analytics.model_dump())
-        last_activity = datetime.now(pytz.utc)
-        
-        await self.collection.update_one(
-            {'id': member.id},
-            {'$set': {
-                'profile.used_commands': used_commands, 
-                'profile.last_activity': last_activity,
-                'profile.commands_counter' : member.profile.commands_counter + 1,
-                'profile.level_exp' : member.profile.level_exp + level_exp
-                }
-            }
-        )
-        
     async def set_badges(self, member_id: int | str, badges: list[str]) -> None:
-        member = await self.check_member_exists(member_id, get_if_exist=True)
-        validated_badges = [validate_badge(badge) for badge in badges if validate_badge(badge) is not None]
-        validated_badges = set(
-            [*member.profile.badges, *[badge.name for badge in validated_badges]]
-        )
+        validated_badges = [validate_badge(badge).name for badge in badges if validate_badge(badge) is not None]
         if len(validated_badges) == 0:
             _log.warn(f'Badges {badges} are not valid')
             return
         
-        await self.collection.update_one(
-            {'id': member.id},
-            {'$set': {'profile.badges': list(validated_badges)}}
+        await self._update_member(
+            member_id,
+            {'$addToSet': {'profile.badges': {'$each': validated_badges}}}
         )
         
     async def get_badges(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> list[str]:
-        member = await self._multi_args_member_checker(member_id, member)
-        return member.profile.badges
+        header = await self._multi_args_header_checker(member_id, member)
+        return header.badges
     
     async def remove_badges(self, member_id: int | str, badges: list[str]) -> None:
         member = await self.check_member_exists(member_id, get_if_exist=True)
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$pull': {'profile.badges': {'$in': badges}}}
         )
     
     async def check_badges(self, member_id: int | str | None = None, member: DBPlayer | None = None) -> None:
-        member = await self._multi_args_member_checker(member_id, member)
-        for badge in member.profile.badges:
-            badge_validated = validate_badge(badge)
-            if badge_validated is None:
-                member.profile.badges.remove(badge)
-                
-        await self.collection.update_one(
-            {'id': member.id},
-            {'$set': {'profile.badges': member.profile.badges}}
+        if (member_id is None) and (member is None):
+            raise ValueError('You must provide either id or member')
+        
+        await self._update_member(
+            member.id if member is not None else member_id,
+            {'$pull': {'profile.badges': {'$nin': list(BadgesEnum.__members__)}}}
         )
         
     async def remove_badge(self, member_id: int | str, badge: str | BadgesEnum) -> None:
@@ -830,14 +1040,14 @@ class PlayersDB:
         if isinstance(badge, BadgesEnum):
             badge = badge.name
             
-        await self.collection.update_one(
-            {'id': member.id},
+        await self._update_member(
+            member.id,
             {'$pull': {'profile.badges': badge}}
         )
         
     async def disable_stats_hook(self, member_id: int | str) -> None:
-        await self.collection.update_one(
-            {'id': member_id},
+        await self._update_member(
+            member_id,
             {'$set': {'hook_stats.active': False}}
         )
 
@@ -846,14 +1056,14 @@ class PlayersDB:
         member_id: int | str, 
         hook: HookStats,
     ) -> None:
-        await self.collection.update_one(
-            {'id': member_id},
+        await self._update_member(
+            member_id,
             {'$set': {'hook_stats': hook.model_dump()}}
         )
     
     async def set_one(self, member_id: int | str, path: str, value: Any) -> None:
         member_id = int(member_id)
-        await self.collection.update_one(
-            {'id': member_id},
+        await self._update_member(
+            member_id,
             {'$set': {path: value}}
         )
@@ -0,0 +1,90 @@
+import asyncio
+import zlib
+
+import pytz
+import motor.motor_asyncio
+from bson.binary import Binary
+from bson.codec_options import CodecOptions
+from pymongo import ReturnDocument
+
+from lib.data_classes.api.api_data import PlayerGlobalData
+from lib.data_classes.db_player import SnapshotRef
+from lib.logger.logger import get_logger
+from lib.utils.singleton_factory import singleton
+
+_log = get_logger(__file__, 'SnapshotsDBLogger', 'logs/snapshots_db.log')
+
+
+@singleton
+class SnapshotsDB:
+    """
+    Store of the `PlayerGlobalData` snapshots that sessions are compared against.
+
+    A snapshot is keyed by `(region, game_id, taken_at)` and stored as zlib compressed JSON.
+    Members reference snapshots with a `SnapshotRef`, so members tracking the same account
+    from the same stats share one snapshot. `refs` counts the references, the snapshot is
+    deleted when the last one is released.
+    """
+    def __init__(self) -> None:
+        self.client = motor.motor_asyncio.AsyncIOMotorClient("mongodb://localhost:27017")
+        self.client.get_io_loop = asyncio.get_running_loop
+        self.db = self.client['TgPlayersDB']
+        self.collection = self.db.get_collection('snapshots', codec_options=CodecOptions(tz_aware=True, tzinfo=pytz.utc))
+
+    @staticmethod
+    def make_id(stats: PlayerGlobalData) -> str:
+        return f'{stats.region}:{stats.id}:{int(stats.timestamp.timestamp())}'
+
+    @staticmethod
+    def encode(stats: PlayerGlobalData) -> Binary:
+        return Binary(zlib.compress(stats.__pydantic_serializer__.to_json(stats)))
+
+    @staticmethod
+    def decode(data: bytes) -> PlayerGlobalData:
+        return PlayerGlobalData.model_validate_json(zlib.decompress(data))
+
+    async def add(self, stats: PlayerGlobalData) -> SnapshotRef:
+        """
+        Stores a snapshot, or takes one more reference on the identical stored snapshot.
+
+        Args:
+            stats (PlayerGlobalData): The stats to store.
+
+        Returns:
+            SnapshotRef: The reference to keep in the member document.
+        """
+        snapshot_id = self.make_id(stats)
+        await self.collection.update_one(
+            {'_id': snapshot_id},
+            {
+                '$inc': {'refs': 1},
+                '$setOnInsert': {
+                    'game_id': stats.id,
+                    'region': stats.region,
+                    'taken_at': stats.timestamp,
+                    'data': self.encode(stats),
+                }
+            },
+            upsert=True
+        )
+        return SnapshotRef(id=snapshot_id, taken_at=stats.timestamp, winrate=stats.data.statistics.all.winrate)
+
+    async def get(self, snapshot_id: str) -> PlayerGlobalData | None:
+        result = await self.collection.find_one({'_id': snapshot_id}, {'data': 1})
+        if result is None:
+            _log.warning(f'Snapshot {snapshot_id} not found')
+            return None
+        return self.decode(result['data'])
+
+    async def release(self, snapshot_id: str) -> None:
+        """
+        Drops one reference on a snapshot and deletes it if it was the last one.
+        """
+        result = await self.collection.find_one_and_update(
+            {'_id': snapshot_id},
+            {'$inc': {'refs': -1}},
+            projection={'refs': 1},
+            return_document=ReturnDocument.AFTER
+        )
+        if result is not None and result['refs'] <= 0:
+            await self.collection.delete_one({'_id': snapshot_id, 'refs': {'$lte': 0}})
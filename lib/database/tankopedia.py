@@ -1,4 +1,10 @@
-from motor.motor_asyncio import AsyncIOMotorClient
+import hashlib
+import json
+from datetime import datetime
+
+import pytz
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorCollection
+from pymongo import DeleteMany, ReplaceOne
 
 from lib.data_classes.tankopedia import Tank
 from lib.logger import logger
@@ -9,6 +15,13 @@ _log = logger.get_logger(__file__, 'TankopediaLogger', 'logs/tankopedia.log')
 
 @singleton
 class TankopediaDB:
+    """
+    Tankopedia of the `ru` region and of the other regions (`eu` collection).
+
+    Both are kept in memory in `index`, preloaded at startup and replaced by every `set_tanks`
+    (see `TankopediaWorker`), so tank lookups don't touch the database. Only ids missing from
+    the index are looked up in the database.
+    """
     def __init__(self) -> None:
         self.client = AsyncIOMotorClient("mongodb://localhost:27017")
         
@@ -16,10 +29,48 @@ class TankopediaDB:
         
         self.collection_ru = self.db.get_collection('tanks_ru')
         self.collection_eu = self.db.get_collection('tanks_eu')
+        self.versions = self.db.get_collection('versions')
+
+        self.index: dict[str, dict[int, Tank]] = {'ru': {}, 'eu': {}}
+        self.misses = 0
+    
+    @staticmethod
+    def _get_index_region(region: str) -> str:
+        return 'ru' if region == 'ru' else 'eu'
+    
+    def _get_collection(self, region: str) -> AsyncIOMotorCollection:
+        return self.collection_ru if region == 'ru' else self.collection_eu
+    
+    async def preload(self) -> None:
+        """
+        Loads the tankopedias of both collections into `index`.
+        """
+        for region in self.index:
+            self.index[region] = {
+                document['id']: Tank.model_validate(document)
+                async for document in self._get_collection(region).find({}, {'_id': 0})
+            }
+        _log.info(f'TankopediaDB: preloaded {", ".join(f"{len(tanks)} {region}" for region, tanks in self.index.items())} tanks')
+    
+    def get_cached_tank(self, id: int | str, region: str) -> Tank | None:
+        return self.index[self._get_index_region(region)].get(int(id))
+    
+    @staticmethod
+    def get_version(documents: list[dict]) -> str:
+        """
+        Returns the hash of a tankopedia, independent of the order of the tanks.
+        """
+        documents = sorted(documents, key=lambda document: document['id'])
+        return hashlib.sha256(json.dumps(documents, sort_keys=True).encode()).hexdigest()
         
     async def get_tank_by_id(self, id: int | str, region: str) -> Tank | None:
         id = int(id)
         
+        tank = self.get_cached_tank(id, region)
+        if tank is not None:
+            return tank
+        self.misses += 1
+        
         if region == 'ru':
             data = await self.collection_ru.find_one({'id': id})
         else:
@@ -29,9 +80,13 @@ class TankopediaDB:
             _log.warn(f"TankopediaDB: tank with id {id} not found in {region} region")
             return data
         
-        return Tank.model_validate(data)
+        tank = Tank.model_validate(data)
+        self.index[self._get_index_region(region)][id] = tank
+        return tank
     
     async def set_tank(self, tank: Tank, region: str):
+        self.index[self._get_index_region(region)][tank.id] = tank
+        
         if region == 'ru':
             if await self.collection_ru.find_one({'id': tank.id}) is None:
                 await self.collection_ru.insert_one(tank.model_dump())
@@ -43,22 +98,64 @@ class TankopediaDB:
             else:
                 await self.collection_eu.update_one({'id': tank.id}, {'$set': tank.model_dump()})
             
-    async def set_tanks(self, tanks: list[Tank], region: str):
-        if region == 'ru':
-            for tank in tanks:
-                if await self.collection_ru.find_one({'id': tank.id}) is None:
-                    await self.collection_ru.insert_one(tank.model_dump())
-                else:
-                    await self.collection_ru.update_one({'id': tank.id}, {'$set': tank.model_dump()})
-        else:
-            for tank in tanks:
-                if await self.collection_eu.find_one({'id': tank.id}) is None:
-                    await self.collection_eu.insert_one(tank.model_dump())
-                else:
-                    await self.collection_eu.update_one({'id': tank.id}, {'$set': tank.model_dump()})
+    async def set_tanks(self, tanks: list[Tank], region: str, remove_missing: bool = False) -> bool:
+        """
+        Synchronizes the tankopedia of a region with `tanks` in one bulk write.
+
+        Only new and changed tanks are written. The hash of the written tankopedia is kept in the
+        `versions` collection, so the same tankopedia is skipped after a single lookup.
+
+        Args:
+            tanks (list[Tank]): The whole tankopedia of the region.
+            region (str): The region.
+            remove_missing (bool, optional): Whether to delete the stored tanks missing from `tanks`. Defaults to False.
+
+        Returns:
+            bool: False if the tankopedia was unchanged and nothing was written.
+        """
+        collection = self._get_collection(region)
+        documents = {tank.id: tank.model_dump() for tank in tanks}
+        index_region = self._get_index_region(region)
+        new_index = {tank.id: tank for tank in tanks}
+        self.index[index_region] = new_index if remove_missing else {**self.index[index_region], **new_index}
+        version = self.get_version(list(documents.values()))
+
+        # A sync without `remove_missing` may have left other tanks, which a sync with it has to remove
+        stored = await self.versions.find_one({'_id': collection.name})
+        if stored is not None and stored['version'] == version and (stored.get('exact') or not remove_missing):
+            _log.debug(f'TankopediaDB: {collection.name} is up to date ({len(documents)} tanks)')
+            return False
+
+        current = {document['id']: document async for document in collection.find({}, {'_id': 0})}
+        operations = [
+            ReplaceOne({'id': tank_id}, document, upsert=True)
+            for tank_id, document in documents.items()
+            if current.get(tank_id) != document
+        ]
+        removed = [tank_id for tank_id in current if tank_id not in documents] if remove_missing else []
+        if removed:
+            operations.append(DeleteMany({'id': {'$in': removed}}))
+
+        if operations:
+            await collection.bulk_write(operations, ordered=False)
+        await self.versions.update_one(
+            {'_id': collection.name},
+            {'$set': {
+                'version': version,
+                'exact': remove_missing,
+                'tanks': len(documents),
+                'updated_at': datetime.now(pytz.utc)
+            }},
+            upsert=True
+        )
+
+        _log.info(f'TankopediaDB: {collection.name} synchronized, {len(operations) - bool(removed)} tanks written, '
+                  f'{len(removed)} removed')
+        return True
 
     async def del_tank(self, id: int | str, region: str):
         id = int(id)
+        self.index[self._get_index_region(region)].pop(id, None)
         
         if region == 'ru':
             await self.collection_ru.delete_one({'id': id})
@@ -5,12 +5,12 @@ from typing import Callable
 from aiogram import Bot
 from aiogram.types import Message, CallbackQuery
 
-from lib.database.players import PlayersDB
 from lib.exceptions import api, data_parser, database, replay_parser
 from lib.exceptions.blacklist import UserBanned
 from lib.exceptions.nickname_validator import NicknameValidationError
 from lib.logger.logger import get_logger
 from lib.utils.singleton_factory import singleton
+from lib.utils.request_context import get_context_member
 from lib.utils.string_parser import insert_data
 
 from lib.locale.locale import Text
@@ -23,12 +23,11 @@ err_logger = get_logger(__file__, 'TgErrorHandler', 'logs/tg_error.log')
 @singleton
 class HookExceptions:
     """catches exceptions, auto loads localization for user"""
-    pdb = PlayersDB()
 
     def hook(hself, _log: Logger=err_logger, del_message_on_error: bool = False) -> Callable:
         def inner1(func: Callable) -> Callable:
             async def inner2(fself, data: Message | CallbackQuery, bot: Bot, *args, **kwargs):
-                await Text().load_by_data(data, await hself.pdb.get_member(data.from_user.id, raise_error=False))
+                await Text().load_by_data(data, await get_context_member(data.from_user.id))
 
                 try:
                     return await func(fself, data, bot=bot, *args, **kwargs)
@@ -7,7 +7,6 @@ import pytz
 import numpy
 from PIL import Image, ImageDraw, ImageFilter, ImageEnhance
 
-from lib.data_classes.api.api_data import PlayerGlobalData
 from lib.data_classes.locale_struct import Localization
 from lib.image.for_image.fonts import Fonts
 from lib.image.for_image.colors import Colors
@@ -470,15 +469,14 @@ class ProfileImageGen:
         
         for slot in AccountSlotsEnum:
             game_account: 'GameAccount | None' = getattr(self.member.game_accounts, slot.name)
-            last_stats: PlayerGlobalData | None = game_account.last_stats if game_account is not None else None
             slot_state = PlayersDB().get_slot_state_sync(slot=slot, member=self.member)
             
             color = Colors.l_grey
             
-            if slot_state == SlotAccessState.used_slot and last_stats is not None:
+            if slot_state == SlotAccessState.used_slot and game_account.has_last_stats:
                 color = colorize(
                     'winrate',
-                    last_stats.data.statistics.all.winrate,
+                    game_account.last_winrate,
                     Colors.l_grey
                 )
                 
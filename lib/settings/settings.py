@@ -1,6 +1,5 @@
 import os
 import traceback
-from itertools import cycle
 
 import dynamic_yaml
 from dotenv import find_dotenv, load_dotenv
@@ -31,9 +30,9 @@ class EnvConfig():
     WG_APP_ID_CL0, WG_APP_ID_CL1 = os.getenv('WG_APP_ID_CL0'), os.getenv('WG_APP_ID_CL1')
     LT_APP_ID_CL0, LT_APP_ID_CL1 = os.getenv('LT_APP_ID_CL0'), os.getenv('LT_APP_ID_CL1')
 
-    WG_APP_IDS = cycle((WG_APP_ID_CL0, WG_APP_ID_CL1))
+    WG_APP_IDS = tuple(app_id for app_id in (WG_APP_ID_CL0, WG_APP_ID_CL1) if app_id)
 
-    LT_APP_IDS = cycle((LT_APP_ID_CL0, LT_APP_ID_CL1))
+    LT_APP_IDS = tuple(app_id for app_id in (LT_APP_ID_CL0, LT_APP_ID_CL1) if app_id)
     
 
 @singleton
@@ -11,9 +11,7 @@ def analytics(command_name: str | None = None) -> Callable:
         cmd_name = command_name if command_name else func.__name__
 
         async def wrapper(*args, **kwargs):
-            member = await pdb.get_member(args[1].from_user.id, raise_error=False)
-            if member:
-                await pdb.set_analytics(UsedCommand(name=cmd_name, last_used=datetime.now()), member)
+            pdb.analytics.add(args[1].from_user.id, UsedCommand(name=cmd_name, last_used=datetime.now()))
             return await func(*args, **kwargs)
 
         return wrapper
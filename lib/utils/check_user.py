@@ -2,8 +2,8 @@ from typing import TYPE_CHECKING, Callable
 
 from lib.locale.locale import Text
 from lib.settings import Config
-from lib.database.players import PlayersDB
 from lib.database.internal import InternalDB
+from lib.utils.request_context import get_context_member
 
 if TYPE_CHECKING:
     from aiogram.types import Message, CallbackQuery
@@ -18,7 +18,6 @@ def check(
         has_premium: bool=False,
         developer_only: bool=False
           ) -> Callable:
-    pdb = PlayersDB()
     idb = InternalDB()
 
     def inner(func: Callable) -> Callable:
@@ -32,7 +31,7 @@ def check(
                 if from_user.id not in _config.developers_id:
                     return
             if in_db:
-                if not await pdb.check_member_exists(from_user.id, raise_error=False):
+                if await get_context_member(from_user.id) is None:
                     await data.reply(Text().get().frequent.info.unregistred_player)
                     return
             if private_only:
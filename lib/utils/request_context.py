@@ -0,0 +1,82 @@
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+
+from aiogram import BaseMiddleware
+
+from lib.data_classes.db_player import DBPlayer
+from lib.database.players import PlayersDB
+
+if TYPE_CHECKING:
+    from aiogram.types import TelegramObject, User
+
+
+class RequestContext:
+    """
+    State of one Telegram update: the member who sent it.
+
+    The member is read once, on first use, and read again only if it was written in between
+    (see `MemberCache.get_version`). Unregistered users are remembered as None.
+    """
+    __slots__ = ('user_id', '_member', '_version')
+
+    def __init__(self, user_id: int | None) -> None:
+        self.user_id = user_id
+        self._member: DBPlayer | None = None
+        self._version: int | None = None
+
+    async def get_member(self) -> DBPlayer | None:
+        if self.user_id is None:
+            return None
+
+        pdb = PlayersDB()
+        version = pdb.members.get_version(self.user_id)
+        if self._version != version:
+            member = await pdb.get_member(self.user_id, raise_error=False)
+            self._member = member if member else None
+            self._version = version
+        return self._member
+
+
+_request_context: ContextVar[RequestContext | None] = ContextVar('request_context', default=None)
+
+
+async def get_context_member(user_id: int) -> DBPlayer | None:
+    """
+    Returns the member of the current update, or reads it from `PlayersDB` outside of an update
+    (or for another user).
+
+    Args:
+        user_id (int): The Telegram id of the member.
+
+    Returns:
+        DBPlayer | None: The member, None if not registered.
+    """
+    context = _request_context.get()
+    if context is not None and context.user_id == user_id:
+        return await context.get_member()
+
+    member = await PlayersDB().get_member(user_id, raise_error=False)
+    return member if member else None
+
+
+class RequestContextMiddleware(BaseMiddleware):
+    """
+    Outer update middleware opening a `RequestContext` for every update.
+
+    Usage Example:
+        >>> dp.update.outer_middleware(RequestContextMiddleware())
+    """
+    async def __call__(
+            self,
+            handler: Callable[['TelegramObject', dict[str, Any]], Awaitable[Any]],
+            event: 'TelegramObject',
+            data: dict[str, Any]
+        ) -> Any:
+        user: 'User | None' = data.get('event_from_user')
+        context = RequestContext(user.id if user else None)
+        token = _request_context.set(context)
+
+        try:
+            return await handler(event, data)
+        finally:
+            _request_context.reset(token)
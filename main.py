@@ -5,9 +5,13 @@ from aiogram import Bot, Dispatcher
 from lib.settings.settings import EnvConfig
 from lib.logger.logger import get_logger
 
-from lib import ButtonsResponces, Config
+from lib import API, ButtonsResponces, Config, PlayersDB
+from lib.database.indexes import apply_indexes
+from lib.database.tankopedia import TankopediaDB
+from lib.utils.request_context import RequestContextMiddleware
 from extensions.setup import ExtensionsSetup
-from workers import PDBWorker, DBBackupWorker, AutoDeleteMessage, CooldownStorageCleanerWorker
+from workers import (PDBWorker, DBBackupWorker, AutoDeleteMessage, CooldownStorageCleanerWorker, RatingLeaderboardWorker,
+                     AnalyticsWorker, InternalWatcherWorker, TankopediaWorker)
 
 #⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⣀⠀⣀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀
 #⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⣀⡤⠶⠚⠉⢉⣩⠽⠟⠛⠛⠛⠃⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀⠀
@@ -55,7 +59,11 @@ class App:
             PDBWorker().run_worker,
             DBBackupWorker().run_worker,
             AutoDeleteMessage().run_worker,
-            CooldownStorageCleanerWorker().run_worker
+            CooldownStorageCleanerWorker().run_worker,
+            RatingLeaderboardWorker().run_worker,
+            AnalyticsWorker().run_worker,
+            InternalWatcherWorker().run_worker,
+            TankopediaWorker().run_worker
         ]
         self.classes = [
             ExtensionsSetup,
@@ -71,11 +79,25 @@ class App:
             for worker in self.workers:
                 tg.create_task(worker(self.bot))
 
+    async def on_startup(self):
+        await apply_indexes(PlayersDB().client)
+        await TankopediaDB().preload()
+        await API().seed_nickname_index()
+
+    async def on_shutdown(self):
+        _log.info('TgBot is shutting down, flushing analytics and closing API sessions')
+        await PlayersDB().analytics.flush()
+        _log.info(f'Analytics buffer: {PlayersDB().analytics.get_counters()}')
+        await API().close()
+
     async def main(self):
         me = await self.bot.get_me()
         _log.info(f'TgBot started as {me.full_name}/@{me.username}')
 
         dp = Dispatcher()
+        dp.startup.register(self.on_startup)
+        dp.shutdown.register(self.on_shutdown)
+        dp.update.outer_middleware(RequestContextMiddleware())
         self.init_classes(dp)
         create_task(self.run_workers())
 
@@ -1,4 +1,8 @@
 from workers.auto_del_mes import AutoDeleteMessage
 from workers.db_backup_worker import DBBackupWorker
 from workers.pdb_checker import PDBWorker
-from workers.cstorage_cleaner import CooldownStorageCleanerWorker
\ No newline at end of file
+from workers.cstorage_cleaner import CooldownStorageCleanerWorker
+from workers.leaderboard_worker import RatingLeaderboardWorker
+from workers.analytics_worker import AnalyticsWorker
+from workers.internal_watcher import InternalWatcherWorker
+from workers.tankopedia_worker import TankopediaWorker
\ No newline at end of file
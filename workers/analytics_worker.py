@@ -0,0 +1,22 @@
+from lib.database.players import PlayersDB
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'TgAnalyticsWorkerLogger', 'logs/analytics_worker.log')
+
+
+class AnalyticsWorker:
+    def __init__(self):
+        self.STOP_FLAG = False
+        self.db = PlayersDB()
+
+    def stop_worker(self):
+        _log.debug('WORKERS: setting STOP_WORKER_FLAG to True')
+        self.STOP_FLAG = True
+
+    async def run_worker(self, *_):
+        """
+        Flushes the command analytics buffer of `PlayersDB` in background.
+        """
+        _log.info('WORKERS: analytics worker started')
+        await self.db.analytics.run(lambda: self.STOP_FLAG)
+        _log.info(f'WORKERS: analytics worker stopped, {self.db.analytics.get_counters()}')
@@ -0,0 +1,22 @@
+from lib.database.internal import InternalDB
+from lib.logger.logger import get_logger
+
+_log = get_logger(__file__, 'TgInternalWatcherWorkerLogger', 'logs/internal_watcher_worker.log')
+
+
+class InternalWatcherWorker:
+    def __init__(self):
+        self.STOP_FLAG = False
+        self.db = InternalDB()
+
+    def stop_worker(self):
+        _log.debug('WORKERS: setting STOP_WORKER_FLAG to True')
+        self.STOP_FLAG = True
+
+    async def run_worker(self, *_):
+        """
+        Keeps the in-memory ban and premium sets of `InternalDB` in sync with the database.
+        """
+        _log.info('WORKERS: internal watcher worker started')
+        await self.db.watch(lambda: self.STOP_FLAG)
+        _log.info('WORKERS: internal watcher worker stopped')
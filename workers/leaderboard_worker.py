@@ -0,0 +1,41 @@
+from asyncio import sleep
+
+from lib.api import API
+from lib.api.scheduler import background_priority
+from lib.database.players import PlayersDB
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config
+
+_log = get_logger(__file__, 'TgRatingLeaderboardWorkerLogger', 'logs/rating_leaderboard_worker.log')
+_config = Config().get()
+
+
+class RatingLeaderboardWorker:
+    def __init__(self):
+        self.STOP_FLAG = False
+        self.api = API()
+        self.db = PlayersDB()
+
+    def stop_worker(self):
+        _log.debug('WORKERS: setting STOP_WORKER_FLAG to True')
+        self.STOP_FLAG = True
+
+    async def run_worker(self, *_):
+        """
+        Periodically prefetches the rating leaderboard positions of every registered game account.
+        """
+        _log.info('WORKERS: rating leaderboard worker started')
+
+        while not self.STOP_FLAG:
+            try:
+                accounts = await self.db.get_all_game_accounts()
+                with background_priority():
+                    await self.api.prefetch_rating_leaderboards(
+                        [(account.region, account.game_id) for account in accounts]
+                    )
+            except Exception:
+                _log.exception('WORKERS: rating leaderboard prefetch failed')
+
+            await sleep(_config.game_api.rating_leaderboard.refresh_interval)
+
+        _log.info('WORKERS: rating leaderboard worker stopped')
@@ -1,4 +1,4 @@
-from asyncio import sleep
+from asyncio import TaskGroup, sleep
 from typing import TYPE_CHECKING
 from datetime import datetime, timedelta
 
@@ -13,10 +13,14 @@ from lib.utils.calculate_exp import get_level
 from lib.utils.string_parser import insert_data
 
 from lib.api import API
+from lib.api.batcher import MAX_BATCH_SIZE
+from lib.api.fields import StatsFields
+from lib.api.scheduler import background_priority
 from lib.locale.locale import Text
 from lib.database.players import PlayersDB
 from lib.image import SessionImageGen
-from lib.data_classes.db_player import BadgesEnum, HookStatsTriggers, HookWatchFor, SessionStatesEnum
+from lib.data_classes.db_player import (BadgesEnum, HookStatsTriggers, HookWatchFor, SessionStatesEnum,
+                                       AccountSlotsEnum, DBPlayer)
 
 if TYPE_CHECKING:
     from aiogram import Bot
@@ -94,7 +98,11 @@ class PDBWorker:
         _log.info('WORKERS: PDB worker started')
         
         while not self.STOP_FLAG:
-            await self.check_database(bot)
+            try:
+                with background_priority():
+                    await self.check_database(bot)
+            except Exception:
+                _log.exception('WORKERS: database check failed, retrying on the next pass')
             await sleep(60 * 5)
             
         _log.info('WORKERS: PDB worker stopped')
@@ -102,7 +110,7 @@ class PDBWorker:
     async def check_database(self, bot: 'Bot') -> None:
         """
         Check the database for any outdated data and update it if necessary.
-        This function iterates over all the member IDs in the database and checks the data timestamp for each member.
+        This function streams all the members of the database in batches and checks the data timestamp for each member.
         If the data is outdated, it updates the data for that member.
         It also checks the premium status for each member.
 
@@ -112,82 +120,145 @@ class PDBWorker:
         Returns:
             None
         """
-        member_ids = await self.db.get_all_members_ids()
+        restarts: list[tuple[int, AccountSlotsEnum]] = []
 
-        for member_id in member_ids:
-            premium_members = await InternalDB().get_actual_premium_users()
-            member = await self.db.get_member(member_id)
-            
-            if member_id in premium_members:
-                premium = member.profile.premium
-                premium_time = member.profile.premium_time
-                if premium and premium_time is not None:
-                    if premium_time < datetime.now(pytz.utc) + timedelta(seconds=3600):
-                        await self.db.set_premium(member_id, datetime.now(pytz.utc) + timedelta(days=1))
-                        _log.info(f'Set premium for {member_id}')
-                elif not premium:
+        premium_members = await InternalDB().get_actual_premium_users()
+
+        async for members in self.db.iter_members(projection={'image': 0}):
+            for member in members:
+                try:
+                    await self.check_member(bot, member, premium_members, restarts)
+                except Exception:
+                    _log.exception(f'WORKERS: check of member {member.id} failed')
+
+        for i in range(0, len(restarts), MAX_BATCH_SIZE):
+            async with TaskGroup() as tg:
+                for member_id, slot in restarts[i:i + MAX_BATCH_SIZE]:
+                    tg.create_task(self.restart_session(member_id, slot))
+
+    async def check_member(
+            self,
+            bot: 'Bot',
+            member: DBPlayer,
+            premium_members: frozenset[int],
+            restarts: list[tuple[int, AccountSlotsEnum]]
+        ) -> None:
+        """
+        Checks one member of the scan of `check_database`, the session restarts are appended to `restarts`.
+
+        The member is read without its image, see `PlayersDB.iter_members`.
+        """
+        member_id = member.id
+        
+        if member_id in premium_members:
+            premium = member.profile.premium
+            premium_time = member.profile.premium_time
+            if premium and premium_time is not None:
+                if premium_time < datetime.now(pytz.utc) + timedelta(seconds=3600):
                     await self.db.set_premium(member_id, datetime.now(pytz.utc) + timedelta(days=1))
+                    _log.info(f'Set premium for {member_id}')
+            elif not premium:
+                await self.db.set_premium(member_id, datetime.now(pytz.utc) + timedelta(days=1))
+        
+        if member.profile.last_activity < datetime.now(pytz.utc) - timedelta(seconds=_config.account.inactive_ttl):
+            await self.db.delete_member(member_id)
+            _log.warning(f'Deleted inactive member {member_id}')
+            return
+        
+        badges = member.profile.badges
+        level = get_level(member.profile.level_exp)
+        
+        if level.level >= 5 and BadgesEnum.active_user.name not in badges:
+            await self.db.set_badges(member_id, [BadgesEnum.active_user.name])
             
-            if member.profile.last_activity < datetime.now(pytz.utc) - timedelta(seconds=_config.account.inactive_ttl):
-                await self.db.delete_member(member_id)
-                _log.warning(f'Deleted inactive member {member_id}')
+        if member.profile.premium and BadgesEnum.premium not in badges:
+            await self.db.set_badges(member_id, [BadgesEnum.premium.name])
             
-            badges = member.profile.badges
-            level = get_level(member.profile.level_exp)
+        used_slots = await self.db.get_all_used_slots(member=member)
+        
+        if len(used_slots) == 0:
+            return
             
-            if level.level >= 5 and BadgesEnum.active_user.name not in badges:
-                await self.db.set_badges(member_id, [BadgesEnum.active_user.name])
-                
-            if member.profile.premium and BadgesEnum.premium not in badges:
-                await self.db.set_badges(member_id, [BadgesEnum.premium.name])
-                
-            used_slots = await self.db.get_all_used_slots(member=member)
+        hook = member.hook_stats
+        if hook.active:
+            data = await self.api.get_stats(game_id=hook.last_stats.id, region=hook.target_region,
+                                            fields=StatsFields.TOTALS)
+            session_diff = await get_session_stats(hook.last_stats, data, True)
+                    
+            if HookWatchFor(hook.watch_for) is HookWatchFor.DIFF:
+                stats_type = 'main_diff' if hook.stats_type == 'common' else 'rating_diff'
+                target_stats = getattr(session_diff, stats_type)
+            elif HookWatchFor(hook.watch_for) is HookWatchFor.SESSION:
+                stats_type = 'main_session' if hook.stats_type == 'common' else 'rating_session'
+                target_stats = getattr(session_diff, stats_type)
+            else:
+                stats_type = 'all' if hook.stats_type == 'common' else hook.stats_type
+                target_stats = getattr(data.data.statistics, stats_type)
             
-            if len(used_slots) == 0:
-                continue
-                
-            hook = member.hook_stats
-            if hook.active:
+            target_value = getattr(target_stats, hook.stats_name)
+
+            if eval(f'{target_value} {HookStatsTriggers[hook.trigger].value} {hook.target_value}'):
+                _log.info(f'Hook triggered for {member_id}. Closing hook')
+                await self.db.disable_stats_hook(member_id)
+                # The image needs the tanks and the medals, the trigger check doesn't
                 data = await self.api.get_stats(game_id=hook.last_stats.id, region=hook.target_region)
                 session_diff = await get_session_stats(hook.last_stats, data, True)
-                        
-                if HookWatchFor(hook.watch_for) is HookWatchFor.DIFF:
-                    stats_type = 'main_diff' if hook.stats_type == 'common' else 'rating_diff'
-                    target_stats = getattr(session_diff, stats_type)
-                elif HookWatchFor(hook.watch_for) is HookWatchFor.SESSION:
-                    stats_type = 'main_session' if hook.stats_type == 'common' else 'rating_session'
-                    target_stats = getattr(session_diff, stats_type)
-                else:
-                    stats_type = 'all' if hook.stats_type == 'common' else hook.stats_type
-                    target_stats = getattr(data.data.statistics, stats_type)
-                
-                target_value = getattr(target_stats, hook.stats_name)
-
-                if eval(f'{target_value} {HookStatsTriggers[hook.trigger].value} {hook.target_value}'):
-                    _log.info(f'Hook triggered for {member_id}. Closing hook')
-                    await self.db.disable_stats_hook(member_id)
-                    image = SessionImageGen().generate(data, session_diff, member, 
-                                                       member.current_slot, hide_nickname=False)
-                    buffered_image = BufferedInputFile(image.read(), "hook.png")
-                    lang = await self.db.get_lang(member_id)
-                    lang = lang if lang != "auto" else hook.lang
-                    await bot.send_photo(
-                        hook.hook_target_chat_id,
-                        buffered_image,
-                        caption=insert_data(Text().get(lang).cmds.hook.info.hook_ended,
-                                            {"user_id": member_id}),
-                        parse_mode="MarkdownV2"
-                    )
+                member = await self.db.get_member(member_id)
+                image = SessionImageGen().generate(data, session_diff, member, 
+                                                   member.current_slot, hide_nickname=False)
+                buffered_image = BufferedInputFile(image.read(), "hook.png")
+                lang = await self.db.get_lang(member_id)
+                lang = lang if lang != "auto" else hook.lang
+                await bot.send_photo(
+                    hook.hook_target_chat_id,
+                    buffered_image,
+                    caption=insert_data(Text().get(lang).cmds.hook.info.hook_ended,
+                                        {"user_id": member_id}),
+                    parse_mode="MarkdownV2"
+                )
+        
+        for slot in used_slots:
+            session_state = await self.db.validate_session(member=member, slot=slot)
             
-            for slot in used_slots:
-                game_account = await self.db.get_game_account(slot, member=member)
-                session_state = await self.db.validate_session(member=member, slot=slot)
-                
-                if session_state is not SessionStatesEnum.RESTART_NEEDED:
-                    continue
-                
-                new_last_stats = await self.api.get_stats(game_id=game_account.game_id, region=game_account.region)
-                game_account.session_settings.time_to_restart += timedelta(days=1)
-                _log.info(f'Session updated for {member_id} in slot {slot.name}')
-                await self.db.update_session(slot, member_id, game_account.session_settings, new_last_stats)
-                await sleep(0.1)
+            if session_state is not SessionStatesEnum.RESTART_NEEDED:
+                continue
+            
+            restarts.append((member_id, slot))
+
+    async def restart_session(self, member_id: int, slot: AccountSlotsEnum) -> None:
+        """
+        Restarts the autosession of a member slot with fresh stats.
+
+        Restarts are run concurrently after the scan, so the account info requests of the whole chunk are
+        batched by the API client. The member is read again before the write: a member deleted since the
+        scan is skipped, and the session settings changed since the scan are kept.
+
+        Parameters:
+            member_id (int): The ID of the member.
+            slot (AccountSlotsEnum): The slot of the session.
+
+        Returns:
+            None
+        """
+        try:
+            member = await self.db.get_member(member_id, raise_error=False)
+            if not member:
+                _log.info(f'Member {member_id} deleted before the session restart')
+                return
+
+            game_account = await self.db.get_game_account(slot, member=member)
+            new_last_stats = await self.api.get_stats(game_id=game_account.game_id, region=game_account.region)
+
+            member = await self.db.get_member(member_id, raise_error=False)
+            if not member or await self.db.validate_session(member=member, slot=slot) is not SessionStatesEnum.RESTART_NEEDED:
+                return
+            game_account = await self.db.get_game_account(slot, member=member)
+            if game_account.game_id != new_last_stats.id:
+                return
+
+            session_settings = await self.db.get_session_settings(slot, member_id, member)
+            session_settings.time_to_restart += timedelta(days=1)
+            await self.db.update_session(slot, member_id, session_settings, new_last_stats)
+            _log.info(f'Session updated for {member_id} in slot {slot.name}')
+        except Exception:
+            _log.exception(f'Failed to restart session for {member_id} in slot {slot.name}')
@@ -0,0 +1,70 @@
+from asyncio import sleep
+
+from pydantic import ValidationError
+
+from lib.api import API
+from lib.api.scheduler import background_priority
+from lib.data_classes.tankopedia import Tank
+from lib.database.tankopedia import TankopediaDB
+from lib.exceptions import api as api_exceptions
+from lib.logger.logger import get_logger
+from lib.settings.settings import Config
+
+_log = get_logger(__file__, 'TgTankopediaWorkerLogger', 'logs/tankopedia_worker.log')
+_config = Config().get()
+
+# API region of every tankopedia collection
+TANKOPEDIA_REGIONS = {'ru': 'ru', 'eu': 'eu'}
+TANK_TYPES = ('mediumTank', 'lightTank', 'heavyTank', 'AT-SPG')
+
+
+class TankopediaWorker:
+    def __init__(self):
+        self.STOP_FLAG = False
+        self.api = API()
+        self.db = TankopediaDB()
+
+    def stop_worker(self):
+        _log.debug('WORKERS: setting STOP_WORKER_FLAG to True')
+        self.STOP_FLAG = True
+
+    @staticmethod
+    def parse_tankopedia(data: dict) -> list[Tank]:
+        tanks = []
+        for tank_data in (data.get('data') or {}).values():
+            if not tank_data:
+                continue
+            try:
+                tanks.append(Tank(
+                    id=tank_data['tank_id'],
+                    name=tank_data['name'],
+                    tier=tank_data['tier'],
+                    type=tank_data['type'] if tank_data.get('type') in TANK_TYPES else 'Unknown'
+                ))
+            except (KeyError, ValidationError):
+                _log.warning(f'WORKERS: skipped invalid tankopedia entry {tank_data.get("tank_id")}')
+        return tanks
+
+    async def run_worker(self, *_):
+        """
+        Periodically reloads the tankopedias from the API into `TankopediaDB` and its in-memory index.
+        """
+        _log.info('WORKERS: tankopedia worker started')
+
+        while not self.STOP_FLAG:
+            for collection_region, api_region in TANKOPEDIA_REGIONS.items():
+                try:
+                    with background_priority():
+                        data = await self.api.get_tankopedia(api_region)
+
+                    tanks = self.parse_tankopedia(data)
+                    if tanks:
+                        await self.db.set_tanks(tanks, collection_region, remove_missing=_config.database.tankopedia.remove_missing)
+                except api_exceptions.APIError:
+                    _log.exception(f'WORKERS: tankopedia request for {api_region} failed')
+                except Exception:
+                    _log.exception(f'WORKERS: tankopedia update for {collection_region} failed')
+
+            await sleep(_config.database.tankopedia.refresh_interval)
+
+        _log.info('WORKERS: tankopedia worker stopped')